@@ -0,0 +1,78 @@
+"""Поля ответов API и их выборка из базы.
+
+Каждый ресурс описан словарём {имя поля в JSON: путь для values_list}.
+Строки читаются кортежами через values_list с нужными JOIN, без
+создания экземпляров моделей, а ``?fields=`` сужает и JSON, и SELECT.
+"""
+from django.core.files.storage import default_storage
+
+POST_FIELDS = {
+    'id': 'pk',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'edited': 'edited',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+GROUP_FIELDS = {
+    'id': 'pk',
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+}
+PROFILE_FIELDS = {
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'posts_count': 'post_counter__posts_count',
+}
+
+
+def image_url(name):
+    return default_storage.url(name) if name else None
+
+
+def posts_count(count):
+    # У автора без постов ещё нет счётчика
+    return count or 0
+
+
+CONVERTERS = {
+    'image': image_url,
+    'posts_count': posts_count,
+}
+
+
+class FieldError(ValueError):
+    pass
+
+
+def selected_fields(request, fields):
+    """Имена полей из ``?fields=`` в порядке запроса, по умолчанию все."""
+    raw = request.GET.get('fields')
+    if raw is None:
+        return list(fields)
+    names = list(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise FieldError(f'Неизвестные поля: {", ".join(unknown)}')
+    if not names:
+        raise FieldError('Не выбрано ни одного поля')
+    return names
+
+
+def select(queryset, fields, names, keys=()):
+    """values_list для полей names; keys — служебные колонки для курсора,
+    они идут в начале кортежа."""
+    return queryset.values_list(*keys, *(fields[name] for name in names))
+
+
+def to_dict(row, names, skip=0):
+    """Строка из select в словарь для JSON."""
+    result = {}
+    for name, value in zip(names, row[skip:]):
+        convert = CONVERTERS.get(name)
+        result[name] = convert(value) if convert else value
+    return result
@@ -0,0 +1,152 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(API_PAGE_SIZE=2)
+class PostsApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth',
+                                            first_name='Имя')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {number}',
+                                group=cls.group if number % 2 else None)
+            for number in range(5)
+        ]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_posts_are_paginated_by_cursor(self):
+        url = reverse('api:posts')
+        ids = []
+        while url:
+            data = self.guest_client.get(url).json()
+            self.assertLessEqual(len(data['results']), 2)
+            ids.extend(post['id'] for post in data['results'])
+            url = data['next']
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+
+    def test_post_fields(self):
+        post = self.guest_client.get(reverse('api:posts')).json()[
+            'results'][0]
+        self.assertEqual(post['text'], 'Пост 4')
+        self.assertEqual(post['author'], 'auth')
+        self.assertIsNone(post['group'])
+        self.assertIsNone(post['image'])
+
+    def test_sparse_fieldset(self):
+        response = self.guest_client.get(reverse('api:posts'),
+                                         {'fields': 'id,author'})
+        self.assertEqual(list(response.json()['results'][0]),
+                         ['id', 'author'])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.guest_client.get(reverse('api:posts'),
+                                         {'fields': 'id,password'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('password', response.json()['error'])
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.guest_client.get(reverse('api:posts'),
+                                         {'after': 'bad'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_list_takes_one_query(self):
+        with self.assertNumQueries(1):
+            self.guest_client.get(reverse('api:posts'))
+
+    def test_repeated_request_gets_not_modified(self):
+        response = self.guest_client.get(reverse('api:posts'))
+        response = self.guest_client.get(
+            reverse('api:posts'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_new_post_changes_etag(self):
+        etag = self.guest_client.get(reverse('api:posts'))['ETag']
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.guest_client.get(reverse('api:posts'),
+                                         HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['results'][0]['text'], 'Новый пост')
+
+    def test_post_detail(self):
+        post = self.posts[1]
+        response = self.guest_client.get(
+            reverse('api:post_detail', args=[post.pk]))
+        self.assertEqual(response.json()['group'], 'test-slug')
+
+    def test_missing_post_is_json_404(self):
+        response = self.guest_client.get(
+            reverse('api:post_detail', args=[0]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertIn('error', response.json())
+
+    def test_group_posts(self):
+        data = self.guest_client.get(
+            reverse('api:group_posts', args=['test-slug']),
+            {'limit': 10}).json()
+        self.assertEqual([post['text'] for post in data['results']],
+                         ['Пост 3', 'Пост 1'])
+
+    def test_group_list_and_detail(self):
+        data = self.guest_client.get(reverse('api:groups'),
+                                     {'fields': 'slug'}).json()
+        self.assertEqual(data, {'results': [{'slug': 'test-slug'}],
+                                'next': None})
+        group = self.guest_client.get(
+            reverse('api:group_detail', args=['test-slug'])).json()
+        self.assertEqual(group['title'], 'Тестовая группа')
+
+    def test_profile(self):
+        profile = self.guest_client.get(
+            reverse('api:profile_detail', args=['auth'])).json()
+        self.assertEqual(profile['first_name'], 'Имя')
+        self.assertEqual(profile['posts_count'], 5)
+        data = self.guest_client.get(
+            reverse('api:profile_posts', args=['auth'])).json()
+        self.assertEqual(len(data['results']), 2)
+
+    def test_name_change_refreshes_profile(self):
+        url = reverse('api:profile_detail', args=['auth'])
+        etag = self.guest_client.get(url)['ETag']
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['first_name'], 'Новое имя')
+
+    def test_username_change_refreshes_post_lists(self):
+        urls = [reverse('api:posts'),
+                reverse('api:group_posts', args=['test-slug'])]
+        etags = [self.guest_client.get(url)['ETag'] for url in urls]
+        author = User.objects.get(pk=self.user.pk)
+        author.username = 'renamed'
+        author.save()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url,
+                                                 HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(response.json()['results'][0]['author'],
+                                 'renamed')
+
+    def test_api_is_read_only(self):
+        response = self.guest_client.post(reverse('api:posts'))
+        self.assertEqual(response.status_code,
+                         HTTPStatus.METHOD_NOT_ALLOWED)
@@ -0,0 +1,145 @@
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.paginator import PageNotAnInteger
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_safe
+
+from posts import materialized
+from posts.caching import (GROUP, INDEX, PROFILE, cache_anonymous_feed,
+                           feed_condition, post_condition)
+from posts.models import Group, Post, User
+from posts.paginators import KeysetPaginator, encode_cursor
+
+from .fields import (GROUP_FIELDS, POST_FIELDS, PROFILE_FIELDS, FieldError,
+                     select, selected_fields, to_dict)
+
+# Без пробелов и \u-экранирования кириллицы: ответ вдвое короче
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return JsonResponse(data, status=status, json_dumps_params=JSON_PARAMS)
+
+
+def api_view(view_func):
+    """Только GET и HEAD; ошибки запроса и 404 отдаются в JSON."""
+    @require_safe
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except (FieldError, PageNotAnInteger) as error:
+            return json_response({'error': str(error)},
+                                 HTTPStatus.BAD_REQUEST)
+        except Http404 as error:
+            return json_response({'error': str(error) or 'Не найдено'},
+                                 HTTPStatus.NOT_FOUND)
+    return wrapper
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        raise FieldError('limit должен быть числом')
+    return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+
+def next_url(request, cursor):
+    query = request.GET.copy()
+    query['after'] = cursor
+    return f'{request.path}?{query.urlencode()}'
+
+
+def post_list(request, posts):
+    """Страница постов после курсора ``?after=``, как в лентах сайта."""
+    names = selected_fields(request, POST_FIELDS)
+    size = page_size(request)
+    paginator = KeysetPaginator(posts, size)
+    after = request.GET.get('after')
+    posts = paginator.older(after) if after else paginator.object_list
+    rows = list(select(posts, POST_FIELDS, names,
+                       keys=('pub_date', 'pk'))[:size + 1])
+    cursor = encode_cursor(*rows[size - 1][:2]) if len(rows) > size else None
+    return json_response({
+        'results': [to_dict(row, names, skip=2) for row in rows[:size]],
+        'next': next_url(request, cursor) if cursor else None,
+    })
+
+
+def get_row(queryset, fields, names):
+    row = select(queryset, fields, names).first()
+    if row is None:
+        raise Http404('Не найдено')
+    return to_dict(row, names)
+
+
+@feed_condition(INDEX)
+@cache_anonymous_feed(INDEX)
+@api_view
+def posts(request):
+    return post_list(request, Post.objects.all())
+
+
+@post_condition
+@api_view
+def post_detail(request, post_id):
+    names = selected_fields(request, POST_FIELDS)
+    return json_response(
+        get_row(Post.objects.filter(pk=post_id), POST_FIELDS, names))
+
+
+@api_view
+def groups(request):
+    """Все группы по id, страницами после ``?after=<id>``."""
+    names = selected_fields(request, GROUP_FIELDS)
+    size = page_size(request)
+    groups = Group.objects.order_by('pk')
+    after = request.GET.get('after')
+    if after:
+        if not after.isdigit():
+            raise FieldError('Неверный курсор страницы')
+        groups = groups.filter(pk__gt=after)
+    rows = list(select(groups, GROUP_FIELDS, names, keys=('pk',))[:size + 1])
+    has_next = len(rows) > size
+    return json_response({
+        'results': [to_dict(row, names, skip=1) for row in rows[:size]],
+        'next': next_url(request, rows[size - 1][0]) if has_next else None,
+    })
+
+
+@feed_condition(GROUP, 'slug')
+@api_view
+def group_detail(request, slug):
+    names = selected_fields(request, GROUP_FIELDS)
+    return json_response(
+        get_row(Group.objects.filter(slug=slug), GROUP_FIELDS, names))
+
+
+@feed_condition(GROUP, 'slug')
+@cache_anonymous_feed(GROUP, 'slug')
+@api_view
+def group_posts(request, slug):
+    group = materialized.get_group(slug)
+    return post_list(request, Post.objects.filter(group_id=group.pk))
+
+
+@feed_condition(PROFILE, 'username')
+@api_view
+def profile_detail(request, username):
+    names = selected_fields(request, PROFILE_FIELDS)
+    return json_response(get_row(User.objects.filter(username=username),
+                                 PROFILE_FIELDS, names))
+
+
+@feed_condition(PROFILE, 'username')
+@cache_anonymous_feed(PROFILE, 'username')
+@api_view
+def profile_posts(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True).first()
+    if author_id is None:
+        raise Http404('Нет такого автора')
+    return post_list(request, Post.objects.filter(author_id=author_id))
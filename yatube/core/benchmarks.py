@@ -0,0 +1,58 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, pct):
+    """Перцентиль по ближайшему рангу из уже отсортированного списка."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def measure(func, repeat):
+    """Вызывает func repeat раз и возвращает время каждого вызова в мс."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)
+
+
+def summarize(timings):
+    return {
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'p99': percentile(timings, 99),
+        'max': timings[-1] if timings else 0.0,
+    }
+
+
+def format_summary(summary):
+    return '  '.join(f'{name}={value:.2f}ms'
+                     for name, value in summary.items())
+
+
+class CaptureAllQueries:
+    """CaptureQueriesContext сразу для всех баз из DATABASES.
+
+    Чтения могут уйти на реплики (см. core.routers), поэтому запросы
+    только к default занижали бы их число. len() — сумма по всем базам.
+    """
+
+    def __enter__(self):
+        self.stack = ExitStack()
+        self.contexts = [
+            self.stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in connections]
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.stack.__exit__(*exc_info)
+
+    def __len__(self):
+        return sum(len(context) for context in self.contexts)
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts.caching import CARDS, request_version
+
+
+def post_cards(request):
+    # Версия читается из кеша, только если шаблон выводит карточки
+    return {
+        'post_cards_version': SimpleLazyObject(
+            lambda: request_version(request, (CARDS,))),
+    }
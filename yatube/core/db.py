@@ -0,0 +1,13 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite по SQLITE_PRAGMAS.
+
+    PRAGMA выполняются на сыром соединении, мимо обёрток Django, чтобы
+    не попадать в статистику и бюджеты запросов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,68 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.text import compress_string
+
+from core.benchmarks import percentile
+from posts.models import Group, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Для страниц лент показывает размер ответа до и после gzip, как '
+        'его сжимает CompressionMiddleware, и процессорное время сжатия '
+        'на один ответ.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--output', help='Файл для JSON с результатами')
+
+    def handle(self, *args, **options):
+        post = Post.objects.select_related('author').first()
+        group = Group.objects.first()
+        if post is None or group is None:
+            raise CommandError('Нет постов: сначала seed_yatube')
+        urls = {
+            'index': reverse('posts:index'),
+            'group_list': reverse('posts:group_list', args=[group.slug]),
+            'profile': reverse('posts:profile', args=[post.author.username]),
+            'post_detail': reverse('posts:post_detail', args=[post.pk]),
+        }
+        client = Client()
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        results = {}
+        with override_settings(ALLOWED_HOSTS=hosts):
+            for name, url in urls.items():
+                content = client.get(url).content
+                results[name] = self.measure(content, options['repeat'])
+                self.report(name, results[name])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
+
+    def measure(self, content, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.process_time()
+            compressed = compress_string(content)
+            timings.append((time.process_time() - started) * 1e6)
+        timings.sort()
+        return {
+            'bytes': len(content),
+            'gzip_bytes': len(compressed),
+            'ratio': len(compressed) / len(content),
+            'cpu_us_p50': percentile(timings, 50),
+            'cpu_us_p95': percentile(timings, 95),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:12} {result["bytes"]:>7} Б -> '
+            f'{result["gzip_bytes"]:>6} Б ({result["ratio"]:.0%})  '
+            f'cpu p50={result["cpu_us_p50"]:.0f}мкс '
+            f'p95={result["cpu_us_p95"]:.0f}мкс')
@@ -0,0 +1,85 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import format_summary, summarize
+
+
+def rss_kb(pid):
+    """Резидентная память процесса из /proc (только Linux)."""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        raise CommandError(f'Не удалось прочитать память процесса {pid}')
+    return 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный сервер параллельными запросами и печатает '
+        'пропускную способность, перцентили задержки и память его '
+        'процессов. Сравнивает воркеры WSGI и ASGI при равной памяти: '
+        'запустите обе конфигурации и передайте их --pid.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='Например http://127.0.0.1:8000')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Адрес страницы, можно несколько раз '
+                                 '(по умолчанию /)')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--pid', type=int, action='append', default=[],
+                            help='PID процесса сервера или воркера, '
+                                 'можно несколько раз')
+        parser.add_argument('--output', help='Файл для JSON с результатами')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        paths = options['paths'] or ['/']
+        urls = [base_url + paths[i % len(paths)]
+                for i in range(options['requests'])]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(self.fetch, urls))
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(timing for timing, _ in results)
+        summary = summarize(timings)
+        errors = sum(1 for _, status in results if status >= 400)
+        memory = sum(rss_kb(pid) for pid in options['pid'])
+        report = {
+            **summary,
+            'rps': len(urls) / elapsed,
+            'errors': errors,
+            'concurrency': options['concurrency'],
+            'rss_kb': memory,
+        }
+        self.stdout.write(format_summary(summary))
+        self.stdout.write(f'{report["rps"]:.1f} запросов/с, ошибок {errors}'
+                          + (f', память {memory / 1024:.1f} МБ'
+                             if memory else ''))
+        if memory:
+            self.stdout.write(
+                f'{report["rps"] / (memory / 1024):.2f} запросов/с на МБ')
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+
+    def fetch(self, url):
+        started = time.perf_counter()
+        try:
+            with urlopen(Request(url), timeout=30) as response:
+                response.read()
+                status = response.status
+        except HTTPError as error:
+            status = error.code
+        return (time.perf_counter() - started) * 1000, status
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count
+
+from core.benchmarks import format_summary, measure, summarize
+from posts.models import Post, PostCounter
+from posts.paginators import KeysetPaginator, encode_cursor
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает EXPLAIN QUERY PLAN и задержку запросов лент '
+        '(главная, группа, профиль, глубокая страница). С '
+        '--without-indexes меряет то же без составных индексов лент: '
+        'они удаляются внутри транзакции, которая затем откатывается, '
+        'так что база не меняется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--group', help='Слаг группы (по умолчанию '
+                                            'самая большая)')
+        parser.add_argument('--author', help='Имя автора (по умолчанию '
+                                             'самый плодовитый)')
+        parser.add_argument('--without-indexes', action='store_true',
+                            help='Замерить без индексов из Post.Meta')
+
+    def handle(self, *args, **options):
+        if not options['without_indexes']:
+            self.run(options)
+            return
+        # DDL в SQLite транзакционен: откат возвращает индексы
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            self.drop_feed_indexes()
+            try:
+                self.run(options)
+            finally:
+                transaction.set_rollback(True, using=DEFAULT_DB_ALIAS)
+
+    def drop_feed_indexes(self):
+        connection = connections[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            for index in Post._meta.indexes:
+                cursor.execute(
+                    f'DROP INDEX {connection.ops.quote_name(index.name)}')
+        self.stdout.write('Индексы лент удалены до конца замера: ' + ', '.join(
+            index.name for index in Post._meta.indexes))
+
+    def run(self, options):
+        group_id = self.pick_group(options['group'])
+        author_id = self.pick_author(options['author'])
+        feeds = {
+            'index': Post.objects.feed(),
+            'group': Post.objects.feed().filter(group_id=group_id),
+            'profile': Post.objects.feed().filter(author_id=author_id),
+        }
+        posts_count = Post.objects.count()
+        self.stdout.write(f'Постов в базе: {posts_count}')
+        for name, posts in feeds.items():
+            paginator = KeysetPaginator(posts, settings.PAGE_SIZE)
+            queryset = paginator.object_list[:paginator.per_page + 1]
+            self.report(name, queryset, options['repeat'])
+        if posts_count:
+            paginator = KeysetPaginator(Post.objects.feed(),
+                                        settings.PAGE_SIZE)
+            middle = paginator.object_list[posts_count // 2:][:1].get()
+            cursor = encode_cursor(middle.pub_date, middle.pk)
+            queryset = paginator.older(cursor)[:paginator.per_page + 1]
+            self.report('index, deep page', queryset, options['repeat'])
+
+    def report(self, name, queryset, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(queryset.explain())
+        timings = measure(lambda: list(queryset.all()), repeat)
+        self.stdout.write(format_summary(summarize(timings)))
+
+    def pick_group(self, slug):
+        if slug:
+            return Post.objects.filter(group__slug=slug).values_list(
+                'group_id', flat=True).first()
+        return (Post.objects.exclude(group=None).order_by()
+                .values_list('group').annotate(posts=Count('pk'))
+                .order_by('-posts').values_list('group', flat=True).first())
+
+    def pick_author(self, username):
+        if username:
+            return Post.objects.filter(author__username=username).values_list(
+                'author_id', flat=True).first()
+        return (PostCounter.objects.order_by('-posts_count')
+                .values_list('user_id', flat=True).first())
@@ -0,0 +1,69 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.benchmarks import format_summary, measure, summarize
+from posts.models import Post, PostCounter
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку страниц авторизованного посетителя при '
+        'разных хранилищах сессий (SESSION_ENGINES) и число запросов к '
+        'базе на ответ.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=100)
+        parser.add_argument('--engine', action='append', dest='engines',
+                            choices=settings.SESSION_ENGINES,
+                            help='Хранилище, можно несколько раз '
+                                 '(по умолчанию все)')
+        parser.add_argument('--output', help='Файл для JSON с результатами')
+
+    def handle(self, *args, **options):
+        author_id = (PostCounter.objects.order_by('-posts_count')
+                     .values_list('user_id', flat=True).first())
+        post = Post.objects.filter(author_id=author_id).select_related(
+            'author').first()
+        if post is None:
+            raise CommandError('Нет постов: сначала seed_yatube')
+        urls = {
+            'index': reverse('posts:index'),
+            'profile': reverse('posts:profile', args=[post.author.username]),
+            'post_create': reverse('posts:post_create'),
+            'post_edit': reverse('posts:post_edit', args=[post.pk]),
+        }
+        results = {}
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        for name in options['engines'] or settings.SESSION_ENGINES:
+            engine = settings.SESSION_ENGINES[name]
+            with override_settings(SESSION_ENGINE=engine,
+                                   ALLOWED_HOSTS=hosts):
+                results[name] = self.run(name, post.author, urls,
+                                         options['repeat'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
+
+    def run(self, name, user, urls, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        client = Client()
+        client.force_login(user)
+        results = {}
+        for page, url in urls.items():
+            client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            # Журнал запросов очищается каждым следующим запросом клиента
+            count = len(queries)
+            summary = summarize(measure(lambda: client.get(url), repeat))
+            results[page] = {**summary, 'queries': count}
+            self.stdout.write(f'{page:12} {format_summary(summary)}  '
+                              f'queries={count}')
+        return results
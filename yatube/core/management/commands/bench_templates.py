@@ -0,0 +1,56 @@
+import copy
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+from django.urls import resolve
+
+from core.benchmarks import format_summary, measure, summarize
+from posts.models import Post
+from posts.paginators import get_page_obj
+
+FILE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время отрисовки posts/index.html с обычными '
+            'загрузчиками шаблонов и с cached-загрузчиком')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--template', default='posts/index.html')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        request.resolver_match = resolve('/')
+        page_obj = get_page_obj(request, Post.objects.feed())
+        context = {'page_obj': page_obj}
+        engines = {
+            'filesystem + app_directories': FILE_LOADERS,
+            'cached': [('django.template.loaders.cached.Loader',
+                        FILE_LOADERS)],
+        }
+        for name, loaders in engines.items():
+            engine = self.engine(loaders)
+
+            def render():
+                template = engine.get_template(options['template'])
+                template.render(context, request)
+
+            timings = measure(render, options['repeat'])
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(format_summary(summarize(timings)))
+
+    def engine(self, loaders):
+        params = copy.deepcopy(settings.TEMPLATES[0])
+        params.pop('BACKEND')
+        params['NAME'] = 'bench'
+        params['APP_DIRS'] = False
+        params['OPTIONS']['loaders'] = loaders
+        return DjangoTemplates(params)
@@ -0,0 +1,177 @@
+import datetime as dt
+import json
+import platform
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import (CaptureAllQueries, format_summary, measure,
+                             summarize)
+from posts.models import Post, PostCounter, User
+from posts.paginators import encode_cursor
+
+
+class Command(BaseCommand):
+    help = (
+        'Гоняет публичные страницы и создание поста через тестовый клиент '
+        'и печатает p50/p95/p99, число запросов к базе и пик памяти. '
+        'С --output пишет результат в JSON, с --compare сравнивает с '
+        'прошлым прогоном. Базу стоит заранее наполнить seed_yatube.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кеш перед каждым запросом')
+        parser.add_argument('--only', nargs='+', metavar='VIEW',
+                            help='Запустить только эти сценарии')
+        parser.add_argument('--output', help='Файл для JSON с результатами')
+        parser.add_argument('--compare', help='JSON прошлого прогона')
+
+    def handle(self, *args, **options):
+        self.options = options
+        author = self.pick_author()
+        post = Post.objects.filter(author=author).first()
+        group_slug = self.pick_group_slug()
+        if post is None or group_slug is None:
+            raise CommandError('Нет постов с группой: сначала seed_yatube')
+
+        scenarios = {
+            'index': self.get(reverse('posts:index')),
+            'index_deep': self.get(self.deep_page_url()),
+            'group_list': self.get(
+                reverse('posts:group_list', args=[group_slug])),
+            'profile': self.get(
+                reverse('posts:profile', args=[author.username])),
+            'post_detail': self.get(
+                reverse('posts:post_detail', args=[post.pk])),
+            'post_create': self.create_post(author),
+            'api_posts': self.get(reverse('api:posts')),
+            'api_group_posts': self.get(
+                reverse('api:group_posts', args=[group_slug])),
+            'api_post_detail': self.get(
+                reverse('api:post_detail', args=[post.pk])),
+        }
+        if options['only']:
+            unknown = set(options['only']) - scenarios.keys()
+            if unknown:
+                raise CommandError(f'Нет сценариев: {", ".join(unknown)}')
+            scenarios = {name: scenarios[name] for name in options['only']}
+
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        results = {}
+        with override_settings(ALLOWED_HOSTS=hosts):
+            for name, scenario in scenarios.items():
+                results[name] = self.run(name, scenario)
+
+        report = {'meta': self.meta(), 'views': results}
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if options['compare']:
+            self.compare(results, options['compare'])
+
+    def get(self, url):
+        client = Client()
+        return lambda: client.get(url)
+
+    def create_post(self, author):
+        client = Client()
+        client.force_login(author)
+        url = reverse('posts:post_create')
+        data = {'text': 'Пост из бенчмарка'}
+
+        def request():
+            # Каждый пост откатывается, чтобы база не росла от прогона
+            with transaction.atomic():
+                response = client.post(url, data)
+                transaction.set_rollback(True)
+            return response
+
+        return request
+
+    def run(self, name, scenario):
+        cache = caches[settings.FEED_CACHE_ALIAS]
+
+        def request():
+            if self.options['cold']:
+                cache.clear()
+            response = scenario()
+            if response.status_code >= 400:
+                raise CommandError(f'{name}: ответ {response.status_code}')
+            return response
+
+        for _ in range(self.options['warmup']):
+            request()
+        timings = measure(request, self.options['repeat'])
+
+        # Запросы и память меряются отдельным вызовом: трассировка
+        # искажает время.
+        with CaptureAllQueries() as queries:
+            tracemalloc.start()
+            try:
+                request()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        summary = summarize(timings)
+        result = {**summary, 'queries': len(queries),
+                  'peak_kb': round(peak / 1024, 1)}
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(f'{format_summary(summary)}  '
+                          f'queries={result["queries"]}  '
+                          f'peak={result["peak_kb"]}KB')
+        return result
+
+    def compare(self, results, path):
+        with open(path, encoding='utf-8') as file:
+            previous = json.load(file)['views']
+        self.stdout.write(self.style.MIGRATE_HEADING('Сравнение'))
+        for name, result in results.items():
+            if name not in previous:
+                continue
+            changes = []
+            for metric in ('p50', 'p95', 'queries', 'peak_kb'):
+                before, after = previous[name][metric], result[metric]
+                change = f'{metric} {before:g} → {after:g}'
+                if before:
+                    change += f' ({(after - before) / before * 100:+.0f}%)'
+                changes.append(change)
+            self.stdout.write(f'{name}: ' + ', '.join(changes))
+
+    def meta(self):
+        return {
+            'date': dt.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'posts': Post.objects.count(),
+            'repeat': self.options['repeat'],
+            'cold': self.options['cold'],
+        }
+
+    def pick_author(self):
+        user_id = (PostCounter.objects.order_by('-posts_count')
+                   .values_list('user_id', flat=True).first())
+        return User.objects.filter(pk=user_id).first()
+
+    def pick_group_slug(self):
+        return (Post.objects.exclude(group=None).order_by()
+                .values_list('group__slug').annotate(posts=Count('pk'))
+                .order_by('-posts').values_list('group__slug', flat=True)
+                .first())
+
+    def deep_page_url(self):
+        """Страница из середины ленты по курсору."""
+        middle = Post.objects.order_by('-pub_date', '-pk')[
+            Post.objects.count() // 2:][:1].get()
+        cursor = encode_cursor(middle.pub_date, middle.pk)
+        return f'{reverse("posts:index")}?after={cursor}'
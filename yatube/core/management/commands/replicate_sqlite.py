@@ -0,0 +1,44 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик через backup API. '
+        'Заменяет настоящую репликацию, чтобы проверить чтение с реплик '
+        'локально.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование раз в столько секунд '
+                 '(по умолчанию один раз)')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены: задайте '
+                               'SQLITE_REPLICA_PATHS')
+        source = settings.DATABASES['default']['NAME']
+        targets = [settings.DATABASES[alias]['NAME']
+                   for alias in settings.DATABASE_REPLICAS]
+        while True:
+            for target in targets:
+                started = time.perf_counter()
+                self.copy(source, target)
+                self.stdout.write(
+                    f'{target}: {(time.perf_counter() - started) * 1000:.0f} '
+                    f'мс')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, source, target):
+        timeout = settings.DATABASES['default']['OPTIONS'].get('timeout', 5)
+        with closing(sqlite3.connect(source, timeout=timeout)) as src:
+            with closing(sqlite3.connect(target, timeout=timeout)) as dst:
+                src.backup(dst)
@@ -0,0 +1,147 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.template.base import Template
+
+MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, float('inf'))
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+
+class ViewMetrics:
+    fields = {
+        'total_ms': MS_BUCKETS,
+        'db_ms': MS_BUCKETS,
+        'template_ms': MS_BUCKETS,
+        'queries': QUERY_BUCKETS,
+    }
+
+    def __init__(self):
+        self.histograms = {name: Histogram(buckets)
+                           for name, buckets in self.fields.items()}
+
+    def observe(self, **values):
+        for name, value in values.items():
+            self.histograms[name].observe(value)
+
+
+class Registry:
+    """Гистограммы по представлениям, общие для всех потоков процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(ViewMetrics)
+
+    def observe(self, view_name, **values):
+        with self._lock:
+            self._views[view_name].observe(**values)
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def export(self):
+        """Текст в формате Prometheus."""
+        lines = []
+        with self._lock:
+            views = sorted(self._views.items())
+            for field in ViewMetrics.fields:
+                metric = f'yatube_view_{field}'
+                lines.append(f'# TYPE {metric} histogram')
+                for view_name, metrics in views:
+                    histogram = metrics.histograms[field]
+                    for bound, total in histogram.cumulative():
+                        le = '+Inf' if bound == float('inf') else bound
+                        lines.append(f'{metric}_bucket{{view="{view_name}",'
+                                     f'le="{le}"}} {total}')
+                    lines.append(f'{metric}_sum{{view="{view_name}"}} '
+                                 f'{histogram.sum:.3f}')
+                    lines.append(f'{metric}_count{{view="{view_name}"}} '
+                                 f'{histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+# Контекстная переменная, а не threading.local: под ASGI в одном потоке
+# одновременно обслуживается несколько запросов
+_stats = ContextVar('request_stats', default=None)
+
+
+def current_stats():
+    return _stats.get()
+
+
+def start_request():
+    stats = RequestStats()
+    _stats.set(stats)
+    return stats
+
+
+def finish_request():
+    _stats.set(None)
+
+
+def instrument_templates():
+    """Учитывает время отрисовки шаблонов в статистике запроса.
+
+    Вложенные шаблоны ({% include %}) не считаются повторно: время
+    набирается только на самом внешнем вызове.
+    """
+    if getattr(Template.render, 'instrumented', False):
+        return
+    original_render = Template.render
+
+    def render(self, context):
+        stats = current_stats()
+        if stats is None:
+            return original_render(self, context)
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_time += time.perf_counter() - started
+
+    render.instrumented = True
+    Template.render = render
@@ -0,0 +1,127 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+
+from . import metrics, routers
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class ViewMetricsMiddleware:
+    """Собирает по каждому представлению число запросов к базе, время
+    базы, шаблонов и всего ответа, и проверяет бюджет запросов из
+    VIEW_QUERY_BUDGETS.
+
+    Превышение бюджета пишется в лог, а при VIEW_QUERY_BUDGET_STRICT
+    (dev и тесты) — роняет запрос.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.instrument_templates()
+
+    def __call__(self, request):
+        stats = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(stats.record_query))
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request()
+        view_name = self.view_name(request)
+        metrics.registry.observe(
+            view_name,
+            total_ms=(time.perf_counter() - started) * 1000,
+            db_ms=stats.db_time * 1000,
+            template_ms=stats.template_time * 1000,
+            queries=stats.queries,
+        )
+        self.check_budget(view_name, stats.queries)
+        return response
+
+    def view_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match else '<unresolved>'
+
+    def check_budget(self, view_name, queries):
+        budget = settings.VIEW_QUERY_BUDGETS.get(view_name)
+        if budget is None or queries <= budget:
+            return
+        message = (f'{view_name}: {queries} запросов к базе '
+                   f'при бюджете {budget}')
+        if settings.VIEW_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaReadMiddleware:
+    """Отправляет чтения представлений из REPLICA_READ_VIEWS на реплики.
+
+    После любого изменяющего запроса ставится короткоживущая cookie, и
+    пока она жива (REPLICA_STICKY_SECONDS), посетитель читает из
+    основной базы: автор сразу видит свой пост, даже если реплика
+    отстаёт. Cookie, а не сессия — чтобы не писать в базу лишний раз.
+    """
+
+    cookie_name = 'primary_reads'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.replica_token is not None:
+                routers.disable_replica_reads(request.replica_token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(self.cookie_name, '1',
+                                max_age=settings.REPLICA_STICKY_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (settings.DATABASE_REPLICAS
+                and request.method in SAFE_METHODS
+                and request.resolver_match.view_name
+                in settings.REPLICA_READ_VIEWS
+                and self.cookie_name not in request.COOKIES):
+            request.replica_token = routers.enable_replica_reads()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Сжимает gzip ответы представлений из COMPRESS_VIEWS.
+
+    Ответы меньше COMPRESS_MIN_SIZE байт отдаются как есть: выигрыш
+    меньше заголовков и затрат процессора. Страницы с CSRF-токеном не
+    сжимаются никогда — иначе по размеру сжатого ответа на запросы с
+    подобранным текстом токен можно угадать (BREACH).
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.compress_response = (
+            request.resolver_match.view_name in settings.COMPRESS_VIEWS)
+
+    def process_response(self, request, response):
+        if not getattr(request, 'compress_response', False):
+            return response
+        if request.META.get('CSRF_COOKIE_USED'):
+            return response
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESS_MIN_SIZE):
+            return response
+        return super().process_response(request, response)
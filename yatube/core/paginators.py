@@ -0,0 +1,22 @@
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор без точного COUNT по большой таблице.
+
+    Без фильтров число строк оценивается по наибольшему id (индекс
+    первичного ключа, удалённые строки не вычитаются). С фильтрами
+    строки считаются не дальше count_limit: дальше этой страницы
+    ссылок не будет, но и запрос не пройдёт всю таблицу.
+    """
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            return queryset.order_by().aggregate(
+                last_id=Max('pk'))['last_id'] or 0
+        return queryset.order_by()[:self.count_limit].count()
@@ -0,0 +1,52 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Сессии читаются до представления и сразу после записи, поэтому
+# всегда идут в основную базу
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def enable_replica_reads():
+    """Разрешает читать с реплик до disable_replica_reads(token)."""
+    return _replica_reads.set(True)
+
+
+def disable_replica_reads(token):
+    _replica_reads.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    token = enable_replica_reads()
+    try:
+        yield
+    finally:
+        disable_replica_reads(token)
+
+
+class PrimaryReplicaRouter:
+    """Пишет всегда в default, читает с реплик из DATABASE_REPLICAS,
+    но только там, где это разрешено replica_reads (см.
+    core.middleware.ReplicaReadMiddleware).
+    """
+
+    def db_for_read(self, model, **hints):
+        if (not _replica_reads.get() or not settings.DATABASE_REPLICAS
+                or model._meta.app_label in PRIMARY_ONLY_APPS):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной базе
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,73 @@
+"""Хранилище статики для collectstatic в боевом профиле.
+
+Имена файлов получают хеш содержимого (ManifestStaticFilesStorage),
+поэтому их можно отдавать с заголовками кеширования на годы. Рядом с
+каждым текстовым файлом кладутся готовые .gz и, если установлен пакет
+brotli, .br: веб-сервер отдаёт их как есть (gzip_static и brotli_static
+в nginx) и не сжимает статику на каждом запросе.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.html', '.json', '.xml',
+}
+# Мельче этого сжатие почти ничего не даёт
+MIN_COMPRESS_SIZE = 512
+
+
+def gzip_compress(content):
+    # mtime=0, чтобы одинаковый файл давал одинаковый архив
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def brotli_compress(content):
+    return brotli.compress(content, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def compressors(self):
+        compressors = [('.gz', gzip_compress)]
+        if brotli is not None:
+            compressors.append(('.br', brotli_compress))
+        return compressors
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Окончательные имена — в манифесте: CSS со ссылками на другие
+        # файлы проходит несколько кругов и меняет хеш
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            compressed = self.compress(hashed_name)
+            if compressed:
+                yield hashed_name, compressed, True
+
+    def compress(self, name):
+        """Пишет сжатые варианты файла, если они заметно меньше.
+
+        Возвращает имя последнего записанного варианта или None.
+        """
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return None
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return None
+        written = None
+        for suffix, compress in self.compressors():
+            compressed = compress(content)
+            if len(compressed) >= len(content) * 0.95:
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            written = self._save(name + suffix, ContentFile(compressed))
+        return written
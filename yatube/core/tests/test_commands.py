@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class BenchViewsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('seed_yatube', users=3, groups=2, posts=30, seed=1,
+                     stdout=StringIO())
+
+    def test_writes_json_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.json')
+            call_command('bench_views', repeat=2, warmup=0, output=path,
+                         stdout=StringIO())
+            with open(path, encoding='utf-8') as file:
+                report = json.load(file)
+        self.assertEqual(set(report['views']), {
+            'index', 'index_deep', 'group_list', 'profile', 'post_detail',
+            'post_create', 'api_posts', 'api_group_posts', 'api_post_detail'})
+        for name, result in report['views'].items():
+            with self.subTest(view=name):
+                self.assertEqual(set(result), {
+                    'p50', 'p95', 'p99', 'max', 'queries', 'peak_kb'})
+
+    def test_created_posts_are_rolled_back(self):
+        call_command('bench_views', repeat=2, warmup=0, only=['post_create'],
+                     stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 30)
+
+
+class BenchFeedQueriesCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username='auth')
+        for number in range(3):
+            Post.objects.create(author=user, text=f'Пост {number}')
+
+    def bench(self, **options):
+        out = StringIO()
+        call_command('bench_feed_queries', repeat=1, stdout=out, **options)
+        return out.getvalue()
+
+    def test_without_indexes_restores_them(self):
+        output = self.bench(without_indexes=True)
+        self.assertIn('Индексы лент удалены', output)
+        self.assertNotIn('USING INDEX post_pub_date_idx', output)
+        with connection.cursor() as cursor:
+            names = {index for index in connection.introspection
+                     .get_constraints(cursor, Post._meta.db_table)}
+        self.assertIn('post_pub_date_idx', names)
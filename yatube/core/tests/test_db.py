@@ -0,0 +1,15 @@
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLitePragmasTest(TestCase):
+    def test_connection_uses_configured_pragmas(self):
+        pragmas = {
+            'synchronous': 1,
+            'cache_size': -64 * 1024,
+        }
+        with connection.cursor() as cursor:
+            for name, expected in pragmas.items():
+                with self.subTest(pragma=name):
+                    cursor.execute(f'PRAGMA {name}')
+                    self.assertEqual(cursor.fetchone()[0], expected)
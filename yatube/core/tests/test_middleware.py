@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..metrics import registry
+from ..middleware import QueryBudgetExceeded
+
+User = get_user_model()
+
+
+class ViewMetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+
+    def setUp(self) -> None:
+        cache.clear()
+        registry.clear()
+        self.guest_client = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_view_metrics_are_recorded(self):
+        self.guest_client.get(reverse('posts:index'))
+        exported = registry.export()
+        for metric in ('total_ms', 'db_ms', 'template_ms', 'queries'):
+            with self.subTest(metric=metric):
+                self.assertIn(
+                    f'yatube_view_{metric}_count{{view="posts:index"}} 1',
+                    exported)
+        self.assertIn('yatube_view_queries_sum{view="posts:index"} 1.000',
+                      exported)
+
+    @override_settings(VIEW_QUERY_BUDGETS={'posts:index': 0},
+                       VIEW_QUERY_BUDGET_STRICT=True)
+    def test_exceeded_budget_fails_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.guest_client.get(reverse('posts:index'))
+
+    @override_settings(VIEW_QUERY_BUDGETS={'posts:index': 0},
+                       VIEW_QUERY_BUDGET_STRICT=False)
+    def test_exceeded_budget_is_logged(self):
+        with self.assertLogs('core.middleware', 'WARNING'):
+            response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_metrics_page_is_for_staff_only(self):
+        response = self.guest_client.get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.staff_client.get(reverse('core:metrics'))
+        self.assertContains(response, '# TYPE yatube_view_total_ms')
+
+
+@override_settings(MIDDLEWARE=[
+    settings.MIDDLEWARE[0],
+    'core.middleware.CompressionMiddleware',
+    *settings.MIDDLEWARE[1:],
+])
+class CompressionMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest_client = Client(HTTP_ACCEPT_ENCODING='gzip')
+
+    def test_feed_is_compressed(self):
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    @override_settings(COMPRESS_MIN_SIZE=10 ** 6)
+    def test_small_response_is_not_compressed(self):
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_view_outside_the_list_is_not_compressed(self):
+        response = self.guest_client.get(reverse('about:author'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(COMPRESS_VIEWS={'posts:post_create'})
+    def test_page_with_csrf_token_is_not_compressed(self):
+        self.guest_client.force_login(self.user)
+        response = self.guest_client.get(reverse('posts:post_create'))
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertFalse(response.has_header('Content-Encoding'))
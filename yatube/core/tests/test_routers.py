@@ -0,0 +1,63 @@
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve
+
+from posts.models import Post
+
+from ..middleware import ReplicaReadMiddleware
+from ..routers import PrimaryReplicaRouter, replica_reads
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replica_only_when_allowed(self):
+        self.assertIsNone(self.router.db_for_read(Post))
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+            self.assertIsNone(self.router.db_for_read(Session))
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_migrations_skip_replicas(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=15)
+class ReplicaReadMiddlewareTest(SimpleTestCase):
+    def read_database(self, method, path, cookies=None):
+        """База, из которой представление прочитало бы посты."""
+        request = getattr(RequestFactory(), method)(path)
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve(path)
+        used = {}
+
+        def get_response(request):
+            middleware.process_view(request, None, (), {})
+            used['db'] = PrimaryReplicaRouter().db_for_read(Post)
+            return HttpResponse()
+
+        middleware = ReplicaReadMiddleware(get_response)
+        response = middleware(request)
+        return used['db'], response.cookies
+
+    def test_feed_reads_from_replica(self):
+        db, _ = self.read_database('get', '/')
+        self.assertEqual(db, 'replica')
+
+    def test_other_views_read_from_primary(self):
+        db, _ = self.read_database('get', '/create/')
+        self.assertIsNone(db)
+
+    def test_writer_sticks_to_primary(self):
+        db, cookies = self.read_database('post', '/create/')
+        self.assertIsNone(db)
+        cookie = cookies[ReplicaReadMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], 15)
+        db, _ = self.read_database(
+            'get', '/', {cookie.key: cookie.value})
+        self.assertIsNone(db)
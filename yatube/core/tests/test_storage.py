@@ -0,0 +1,59 @@
+import gzip
+import os
+from io import StringIO
+from unittest import skipIf
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+
+from core import storage
+
+from .utils import TempDirMixin
+
+
+@override_settings(
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+)
+class CompressedManifestStorageTest(TempDirMixin, SimpleTestCase):
+    temp_dir_setting = 'STATIC_ROOT'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0,
+                     stdout=StringIO())
+
+    def path(self, name):
+        return os.path.join(self.temp_dir, name)
+
+    def test_names_are_hashed(self):
+        hashed = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        self.assertRegex(hashed, r'^css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+
+    def test_gzip_variant_matches_original(self):
+        hashed = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        with open(self.path(hashed), 'rb') as original, \
+                gzip.open(self.path(hashed + '.gz')) as compressed:
+            self.assertEqual(compressed.read(), original.read())
+
+    @skipIf(storage.brotli is None, 'пакет brotli не установлен')
+    def test_brotli_variant_matches_original(self):
+        hashed = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        with open(self.path(hashed), 'rb') as original, \
+                open(self.path(hashed + '.br'), 'rb') as compressed:
+            self.assertEqual(storage.brotli.decompress(compressed.read()),
+                             original.read())
+
+    def test_images_are_not_compressed(self):
+        hashed = staticfiles_storage.stored_name('img/logo.png')
+        self.assertFalse(os.path.exists(self.path(hashed + '.gz')))
+
+
+class FaviconLinksTest(TestCase):
+    def test_favicons_use_static_urls(self):
+        response = Client().get('/')
+        self.assertContains(
+            response, f'href="{settings.STATIC_URL}img/fav/favicon.ico"')
+        self.assertNotContains(response, 'href="img/fav/')
@@ -0,0 +1,35 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+
+
+class TempDirMixin:
+    """Подменяет настройку-каталог временным каталогом на время класса.
+
+    Каталог создаётся вне дерева исходников в setUpClass и удаляется
+    вместе с содержимым в tearDownClass.
+    """
+    temp_dir_setting = 'MEDIA_ROOT'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.temp_dir_override = override_settings(
+            **{cls.temp_dir_setting: cls.temp_dir})
+        cls.temp_dir_override.enable()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls.remove_temp_dir()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.remove_temp_dir()
+
+    @classmethod
+    def remove_temp_dir(cls):
+        cls.temp_dir_override.disable()
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
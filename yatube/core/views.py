@@ -0,0 +1,10 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+
+from .metrics import registry
+
+
+@staff_member_required
+def metrics(request):
+    return HttpResponse(registry.export(),
+                        content_type='text/plain; version=0.0.4')
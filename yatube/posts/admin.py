@@ -1,8 +1,84 @@
+import datetime as dt
+
 from django.contrib import admin
+from django.utils import timezone
+
+from core.paginators import EstimatedCountPaginator
 
+from . import search
 from .models import Group, Post
 
 
+class PubDateFilter(admin.SimpleListFilter):
+    """Фильтр по году и месяцу публикации, как date_hierarchy.
+
+    В отличие от date_hierarchy, не собирает DISTINCT по датам всей
+    таблицы: годы и месяцы проверяются запросами EXISTS по диапазону
+    pub_date, которые идут по индексу.
+    """
+    title = 'дата публикации'
+    parameter_name = 'published'
+
+    def lookups(self, request, model_admin):
+        queryset = model_admin.get_queryset(request)
+        period = self.period()
+        if period is None:
+            first = queryset.order_by('pub_date').values_list(
+                'pub_date', flat=True).first()
+            if first is None:
+                return []
+            last = queryset.order_by('-pub_date').values_list(
+                'pub_date', flat=True).first()
+            periods = [((number, None), str(number))
+                       for number in range(last.year, first.year - 1, -1)]
+        else:
+            year, _ = period
+            periods = [((year, month), f'{month:02}.{year}')
+                       for month in range(12, 0, -1)]
+        return [(self.format_period(*period), title)
+                for period, title in periods
+                if queryset.filter(**self.date_range(*period)).exists()]
+
+    def queryset(self, request, queryset):
+        period = self.period()
+        if period is None:
+            return None
+        return queryset.filter(**self.date_range(*period))
+
+    def period(self):
+        """(год, месяц или None) из значения фильтра.
+
+        Неразборчивое значение или дата вне диапазона datetime считается
+        невыбранным фильтром, а не ошибкой 500.
+        """
+        year, _, month = (self.value() or '').partition('-')
+        try:
+            year, month = int(year), int(month) if month else None
+        except ValueError:
+            return None
+        # Конец периода — начало следующего года, он тоже должен
+        # поместиться в datetime
+        if not dt.MINYEAR <= year < dt.MAXYEAR:
+            return None
+        if month is not None and not 1 <= month <= 12:
+            return None
+        return year, month
+
+    @staticmethod
+    def format_period(year, month):
+        return str(year) if month is None else f'{year}-{month:02}'
+
+    @staticmethod
+    def date_range(year, month):
+        if month:
+            start = dt.datetime(year, month, 1)
+            end = dt.datetime(year + month // 12, month % 12 + 1, 1)
+        else:
+            start, end = dt.datetime(year, 1, 1), dt.datetime(year + 1, 1, 1)
+        return {'pub_date__gte': timezone.make_aware(start),
+                'pub_date__lt': timezone.make_aware(end)}
+
+
 class PostAdmin(admin.ModelAdmin):
     list_display = (
         'pk',
@@ -12,9 +88,20 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    # Выпадающие списки всех групп и авторов на каждой строке
+    # заменяются поиском
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    # Стандартный фильтр по pub_date (сегодня, неделя, месяц, год)
+    # тоже фильтрует диапазоном и обходится без запросов
+    list_filter = ('pub_date', PubDateFilter)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        return search.filter_matching(queryset, search_term), False
 
 
 class GroupAdmin(admin.ModelAdmin):
@@ -30,4 +117,4 @@ class GroupAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
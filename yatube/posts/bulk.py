@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+
+from .caching import INDEX, INDEX_TAIL, touch_on_commit
+from .models import Post, PostCounter
+
+
+@contextmanager
+def preserve_timestamps():
+    """Даёт bulk_create записать pub_date и edited из объектов.
+
+    Иначе auto_now_add и auto_now подменят их текущим временем.
+    """
+    fields = [Post._meta.get_field('pub_date'),
+              Post._meta.get_field('edited')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def refresh_after_bulk_insert():
+    """Обновляет то, что сигналы не видят при bulk_create.
+
+    Счётчики постов пересчитываются одним агрегатом, а главная лента
+    вытесняется из кеша целиком.
+    """
+    PostCounter.objects.rebuild()
+    touch_on_commit((INDEX,), (INDEX_TAIL,))
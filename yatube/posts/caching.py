@@ -0,0 +1,236 @@
+import datetime as dt
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+
+from .models import Post
+
+# Первые страницы главной сдвигаются от каждого нового поста, а страницы
+# после курсора ``?after=`` меняются только при правке или удалении.
+INDEX = 'index'
+INDEX_TAIL = 'index-tail'
+GROUP = 'group'
+PROFILE = 'profile'
+# Карточки постов показывают имя автора и название группы: их версия
+# входит в ключ кеша карточки и поднимается, когда те меняются.
+CARDS = 'cards'
+
+
+def feed_cache():
+    return caches[settings.FEED_CACHE_ALIAS]
+
+
+def key_part(value):
+    """Слаг или имя пользователя для ключа кеша.
+
+    memcached не принимает в ключах не-ASCII и пробелы, а длину
+    ограничивает 250 байтами, поэтому значение хешируется.
+    """
+    return hashlib.md5(str(value).encode()).hexdigest()
+
+
+def version_key(scope):
+    name, *values = scope
+    return ':'.join(['feed-version', name, *map(key_part, values)])
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def get_versions(*scopes):
+    """Возвращает версии областей ленты, заводя недостающие.
+
+    Версия — время последнего изменения области в миллисекундах. Если
+    кеш потерял версию или она истекла (FEED_VERSION_TIMEOUT), новая
+    берётся от текущего времени и не совпадёт ни с одной из выданных
+    раньше.
+    """
+    cache = feed_cache()
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: now_ms() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, settings.FEED_VERSION_TIMEOUT)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def touch(*scopes):
+    """Поднимает версии областей, после чего их страницы не найдутся.
+
+    Возвращает {область: (старая версия, новая версия)}; старой версии
+    нет (None), если её не было в кеше.
+    """
+    cache = feed_cache()
+    keys = [version_key(scope) for scope in scopes]
+    now = now_ms()
+    versions = cache.get_many(keys)
+    bumped = {key: max(now, versions.get(key, 0) + 1) for key in keys}
+    cache.set_many(bumped, settings.FEED_VERSION_TIMEOUT)
+    return {scope: (versions.get(key), bumped[key])
+            for scope, key in zip(scopes, keys)}
+
+
+def expire_on_commit(expire):
+    """Выполняет expire сейчас и ещё раз после фиксации транзакции.
+
+    Параллельный запрос, пришедший между первым вызовом и фиксацией,
+    читает старые строки и кеширует их под новой версией: второй вызов
+    делает такие записи недостижимыми. Первый нужен чтениям внутри самой
+    транзакции; вне транзакции on_commit выполняется сразу, и вызов один.
+    """
+    if transaction.get_connection().in_atomic_block:
+        expire()
+    transaction.on_commit(expire)
+
+
+def touch_on_commit(*scopes):
+    expire_on_commit(lambda: touch(*scopes))
+
+
+def request_scope(request, scope, value=None):
+    if scope == INDEX and request.GET.get('after'):
+        return (INDEX_TAIL,)
+    if value is None:
+        return (scope,)
+    return (scope, value)
+
+
+def request_versions(request, *scopes):
+    """Версии областей, прочитанные один раз за запрос."""
+    versions = request.__dict__.setdefault('_feed_versions', {})
+    missing = [scope for scope in scopes if scope not in versions]
+    if missing:
+        versions.update(zip(missing, get_versions(*missing)))
+    return [versions[scope] for scope in scopes]
+
+
+def request_version(request, scope):
+    return request_versions(request, scope)[0]
+
+
+def page_versions(request, scope):
+    """Версии, от которых зависит страница: её области и карточек.
+
+    Имена авторов и названия групп в постах меняются без записи поста,
+    их отражает только версия CARDS.
+    """
+    return request_versions(request, scope, (CARDS,))
+
+
+def version_datetime(version):
+    return dt.datetime.fromtimestamp(version / 1000, tz=dt.timezone.utc)
+
+
+def viewer(request):
+    return request.user.pk if request.user.is_authenticated else 0
+
+
+def page_key(request, scope):
+    version, cards_version = page_versions(request, scope)
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'feed-page:{path}:{version}-{cards_version}'
+
+
+def cache_anonymous_feed(scope, kwarg=None, timeout=None):
+    """Кеширует отрисованную страницу ленты для анонимных посетителей.
+
+    Ключ страницы включает версию её области (вся главная, группа или
+    профиль из ``kwargs[kwarg]``), поэтому запись поста вытесняет только
+    затронутые области, и версию карточек (см. page_versions). timeout
+    по умолчанию — FEED_CACHE_TIMEOUT.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+            key = page_key(request,
+                           request_scope(request, scope, kwargs.get(kwarg)))
+            cache = feed_cache()
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response['Content-Type']),
+                          settings.FEED_CACHE_TIMEOUT
+                          if timeout is None else timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def feed_condition(scope, kwarg=None):
+    """Отвечает 304 на повторный запрос ленты, не трогая базу.
+
+    Валидатор — версии области ленты и карточек и посетитель: страница
+    меняется только вместе с ними.
+    """
+    def versions(request, kwargs):
+        return page_versions(
+            request, request_scope(request, scope, kwargs.get(kwarg)))
+
+    def etag(request, *args, **kwargs):
+        version, cards_version = versions(request, kwargs)
+        return f'{version}-{cards_version}-{viewer(request)}'
+
+    def last_modified(request, *args, **kwargs):
+        return version_datetime(max(versions(request, kwargs)))
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def post_state(request, post_id):
+    """Время правки поста и версии профиля автора и карточек.
+
+    Пост читается одним запросом, версии — одним обращением к кешу.
+    """
+    if not hasattr(request, '_post_state'):
+        row = Post.objects.filter(pk=post_id).values_list(
+            'edited', 'author__username').first()
+        if row is None:
+            request._post_state = None
+        else:
+            edited, username = row
+            request._post_state = (
+                int(edited.timestamp() * 1000),
+                *page_versions(request, (PROFILE, username)),
+            )
+    return request._post_state
+
+
+def post_etag(request, post_id):
+    state = post_state(request, post_id)
+    if state is None:
+        return None
+    return '-'.join(map(str, (*state, viewer(request))))
+
+
+def post_last_modified(request, post_id):
+    state = post_state(request, post_id)
+    if state is None:
+        return None
+    return version_datetime(max(state))
+
+
+post_condition = condition(etag_func=post_etag,
+                           last_modified_func=post_last_modified)
+
+
+def expire_post_feeds(usernames=(), slugs=(), created=False):
+    """Вытесняет ленты, в которых появился, изменился или пропал пост."""
+    scopes = [(INDEX,)]
+    if not created:
+        scopes.append((INDEX_TAIL,))
+    scopes.extend((PROFILE, username) for username in usernames)
+    scopes.extend((GROUP, slug) for slug in slugs)
+    return touch(*scopes)
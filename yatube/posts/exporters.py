@@ -0,0 +1,89 @@
+"""Потоковая выгрузка постов в NDJSON и CSV.
+
+Строки читаются через values_list(...).iterator(), поэтому в памяти
+одновременно лежит не больше одной пачки, сколько бы ни было постов.
+
+Текст в CSV экранируется от подстановки формул: выгрузку открывают в
+таблицах, а текст поста, имя автора и название группы пишут посетители.
+"""
+import csv
+import json
+
+from django.conf import settings
+
+from .models import Post
+
+# Имя колонки в выгрузке: поле модели
+EXPORT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'edited': 'edited',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'group_title': 'group__title',
+}
+
+# С этих символов Excel и LibreOffice начинают формулу. Апостроф
+# экранируется сам, чтобы import_posts мог однозначно снять экранирование.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r', "'")
+
+
+def export_rows(queryset=None, chunk_size=None):
+    """Словари постов с автором и группой в порядке id."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    rows = (queryset.order_by('pk')
+            .values_list(*EXPORT_FIELDS.values())
+            .iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE))
+    for row in rows:
+        yield dict(zip(EXPORT_FIELDS, row))
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        row['pub_date'] = row['pub_date'].isoformat()
+        row['edited'] = row['edited'].isoformat()
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+class Echo:
+    """Файл, который возвращает записанное вместо того, чтобы хранить."""
+
+    def write(self, value):
+        return value
+
+
+def escape_cell(value):
+    """Апостроф перед значением, которое таблица сочла бы формулой."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def unescape_cell(value):
+    if isinstance(value, str) and value.startswith("'"):
+        return value[1:]
+    return value
+
+
+def csv_lines(rows):
+    writer = csv.DictWriter(Echo(), fieldnames=list(EXPORT_FIELDS))
+    yield writer.writerow(dict(zip(EXPORT_FIELDS, EXPORT_FIELDS)))
+    for row in rows:
+        row['pub_date'] = row['pub_date'].isoformat()
+        row['edited'] = row['edited'].isoformat()
+        yield writer.writerow(
+            {name: escape_cell(value) for name, value in row.items()})
+
+
+# Формат: (генератор строк, Content-Type)
+FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+}
+
+
+def export_lines(export_format, queryset=None, chunk_size=None):
+    lines, _ = FORMATS[export_format]
+    return lines(export_rows(queryset, chunk_size))
@@ -0,0 +1,135 @@
+"""RSS и Atom для главной, групп и авторов.
+
+Лента — последние SYNDICATION_SIZE постов одним запросом с автором и
+группой. Готовый XML кешируется по версиям области ленты и карточек
+(см. caching.page_versions), поэтому живёт до следующего сохранения
+поста в этой области или переименования автора или группы, а повторный
+опрос с If-None-Match или If-Modified-Since получает 304 без обращения
+к базе.
+"""
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from . import materialized
+from .caching import (GROUP, INDEX, PROFILE, cache_anonymous_feed,
+                      feed_condition)
+from .models import Post, User
+
+
+class PostsFeed(Feed):
+    """Общая часть лент: как пост становится записью ленты."""
+
+    def __call__(self, request, *args, **kwargs):
+        response = super().__call__(request, *args, **kwargs)
+        # Last-Modified ставит feed_condition по версии области: дата
+        # последнего поста с ней не совпадает, и If-Modified-Since
+        # никогда не давал бы 304
+        del response['Last-Modified']
+        return response
+
+    def latest(self, posts):
+        return posts.feed()[:settings.SYNDICATION_SIZE]
+
+    def item_title(self, post):
+        return Truncator(post.text).words(10)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', args=[post.pk])
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.edited
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_categories(self, post):
+        return [post.group.title] if post.group_id else []
+
+
+class IndexFeed(PostsFeed):
+    title = 'Yatube: последние посты'
+    description = 'Новые посты всех авторов'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def items(self):
+        return self.latest(Post.objects.all())
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return materialized.get_group(slug)
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=[group.slug])
+
+    def items(self, group):
+        return self.latest(Post.objects.filter(group_id=group.pk))
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Yatube: посты {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Новые посты пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=[author.username])
+
+    def items(self, author):
+        return self.latest(Post.objects.filter(author_id=author.pk))
+
+
+class IndexAtomFeed(IndexFeed):
+    feed_type = Atom1Feed
+    subtitle = IndexFeed.description
+
+
+class GroupAtomFeed(GroupFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, group):
+        return self.description(group)
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
+
+
+def cached(feed, scope, kwarg=None):
+    """Представление ленты с 304 и кешем по версиям области и карточек."""
+    view = cache_anonymous_feed(
+        scope, kwarg, timeout=settings.SYNDICATION_CACHE_TIMEOUT)(feed)
+    return feed_condition(scope, kwarg)(view)
+
+
+index_rss = cached(IndexFeed(), INDEX)
+index_atom = cached(IndexAtomFeed(), INDEX)
+group_rss = cached(GroupFeed(), GROUP, 'slug')
+group_atom = cached(GroupAtomFeed(), GROUP, 'slug')
+profile_rss = cached(AuthorFeed(), PROFILE, 'username')
+profile_atom = cached(AuthorAtomFeed(), PROFILE, 'username')
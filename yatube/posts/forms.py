@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from django.forms import ModelForm
 
 from .models import Post
@@ -7,11 +8,20 @@ from .models import Post
 class PostForm(ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
         widgets = {
             'text': forms.Textarea(attrs={'rows': 10, 'cols': 40}),
         }
         help_texts = {
             'text': 'Текст нового поста',
             'group': 'Группа, к которой будет относиться пост',
+            'image': 'Картинка к посту',
         }
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Поиск', max_length=200)
+    group = forms.SlugField(label='Группа', required=False)
+    author = forms.CharField(label='Автор', max_length=150, required=False)
+    page = forms.IntegerField(min_value=1, max_value=settings.SEARCH_MAX_PAGE,
+                              required=False)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from posts.exporters import FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = ('Выгружает все посты с автором и группой в NDJSON или CSV, '
+            'не загружая их в память целиком')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--output', help='Файл (по умолчанию stdout)')
+        parser.add_argument('--chunk-size', type=int,
+                            help='Сколько строк читать из базы за раз '
+                                 '(по умолчанию EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        lines = export_lines(options['format'],
+                             chunk_size=options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            file.writelines(lines)
+        self.stdout.write(self.style.SUCCESS(
+            f'Посты выгружены в {options["output"]}'))
@@ -0,0 +1,202 @@
+import csv
+import itertools
+import json
+import os
+import time
+from collections import Counter
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import search
+from posts.bulk import preserve_timestamps
+from posts.caching import expire_post_feeds
+from posts.exporters import unescape_cell
+from posts.models import Group, Post, PostCounter, User
+
+
+def read_ndjson(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(file):
+    # Снимает экранирование формул, которое добавляет export_posts
+    for row in csv.DictReader(file):
+        yield {name: unescape_cell(value) for name, value in row.items()}
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+class Checkpoint:
+    """Сколько строк источника уже в базе.
+
+    Перед коммитом пачки в файл пишется, докуда она дойдёт, и последний
+    id поста до неё. Если процесс упал между коммитом и записью итога,
+    при возобновлении по наличию постов с большим id видно, что пачка
+    всё-таки сохранилась. Поэтому во время импорта в posts_post не
+    должен писать никто другой.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as file:
+            state = json.load(file)
+        pending = state.get('pending')
+        if pending and Post.objects.filter(pk__gt=state['last_id']).exists():
+            return pending
+        return state['rows']
+
+    def save(self, rows, last_id, pending=None):
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'rows': rows, 'last_id': last_id,
+                       'pending': pending}, file)
+        os.replace(temporary, self.path)
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из NDJSON или CSV (колонки как у export_posts: '
+        'text, author, group, pub_date). Файл читается потоком, авторы и '
+        'группы ищутся по словарям в памяти, посты вставляются пачками '
+        'в транзакциях, а счётчики постов и поисковый индекс '
+        'обновляются на пачку целиком. Прерванный импорт продолжается '
+        'с места, записанного в файл контрольной точки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=READERS,
+                            help='По умолчанию по расширению файла')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--checkpoint',
+                            help='Файл контрольной точки '
+                                 '(по умолчанию <path>.checkpoint)')
+        parser.add_argument('--create-missing', action='store_true',
+                            help='Создавать неизвестных авторов и группы '
+                                 'вместо того, чтобы пропускать посты')
+
+    def handle(self, *args, **options):
+        self.options = options
+        reader = READERS[options['format'] or self.guess_format()]
+        checkpoint = Checkpoint(
+            options['checkpoint'] or options['path'] + '.checkpoint')
+        done = checkpoint.load()
+        if done:
+            self.stdout.write(f'Продолжаю с {done}-й строки')
+
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.password = make_password(None)
+        self.imported = self.skipped = 0
+        started = time.perf_counter()
+
+        with open(options['path'], encoding='utf-8', newline='') as file:
+            rows = itertools.islice(reader(file), done, None)
+            while True:
+                batch = list(itertools.islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                batch_started = time.perf_counter()
+                checkpoint.save(done, self.last_id(),
+                                pending=done + len(batch))
+                imported = self.import_batch(batch, done)
+                done += len(batch)
+                checkpoint.save(done, self.last_id())
+                elapsed = time.perf_counter() - batch_started
+                self.stdout.write(
+                    f'Строк {done}: +{imported} постов, '
+                    f'{imported / elapsed:.0f} постов/с')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано {self.imported}, пропущено {self.skipped} '
+            f'за {elapsed:.1f} с ({self.imported / elapsed:.0f} постов/с)'))
+
+    def guess_format(self):
+        extension = os.path.splitext(self.options['path'])[1].lower()
+        if extension == '.csv':
+            return 'csv'
+        if extension in ('.ndjson', '.jsonl'):
+            return 'ndjson'
+        raise CommandError('Не понял формат по расширению: укажите --format')
+
+    def last_id(self):
+        return Post.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+
+    def import_batch(self, batch, offset):
+        posts, usernames, slugs = [], set(), set()
+        with transaction.atomic():
+            if self.options['create_missing']:
+                self.create_missing(batch)
+            for number, row in enumerate(batch, offset + 1):
+                post = self.make_post(row)
+                if post is None:
+                    self.skipped += 1
+                    if self.options['verbosity'] > 1:
+                        self.stderr.write(f'Строка {number} пропущена')
+                    continue
+                posts.append(post)
+                usernames.add(row['author'])
+                if post.group_id:
+                    slugs.add(row['group'])
+            with preserve_timestamps(), search.deferred_indexing():
+                Post.objects.bulk_create(posts)
+            PostCounter.objects.add_many(
+                Counter(post.author_id for post in posts))
+        # Импортированные посты могут оказаться в середине ленты,
+        # поэтому вытесняется и её хвост
+        expire_post_feeds(usernames, slugs, created=False)
+        self.imported += len(posts)
+        return len(posts)
+
+    def make_post(self, row):
+        text = (row.get('text') or '').strip()
+        author_id = self.users.get(row.get('author'))
+        slug = row.get('group') or None
+        group_id = self.groups.get(slug)
+        if not text or author_id is None or (slug and group_id is None):
+            return None
+        pub_date = self.parse_date(row.get('pub_date'))
+        edited = self.parse_date(row.get('edited')) if row.get(
+            'edited') else pub_date
+        return Post(text=text, author_id=author_id, group_id=group_id,
+                    pub_date=pub_date, edited=edited)
+
+    def parse_date(self, value):
+        parsed = parse_datetime(value) if value else None
+        if parsed is None:
+            return timezone.now()
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, timezone.utc)
+        return parsed
+
+    def create_missing(self, batch):
+        usernames = {row.get('author') for row in batch} - {None, ''}
+        new_users = usernames - self.users.keys()
+        if new_users:
+            User.objects.bulk_create(
+                (User(username=username, password=self.password)
+                 for username in new_users), ignore_conflicts=True)
+            self.users.update(User.objects.filter(
+                username__in=new_users).values_list('username', 'pk'))
+        titles = {row['group']: row.get('group_title') or row['group']
+                  for row in batch if row.get('group')}
+        new_groups = titles.keys() - self.groups.keys()
+        if new_groups:
+            Group.objects.bulk_create(
+                (Group(slug=slug, title=titles[slug], description='')
+                 for slug in new_groups), ignore_conflicts=True)
+            self.groups.update(Group.objects.filter(
+                slug__in=new_groups).values_list('slug', 'pk'))
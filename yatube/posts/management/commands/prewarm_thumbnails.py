@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт недостающие миниатюры картинок постов всех размеров из '
+        'POST_THUMBNAILS, чтобы страницы их только читали. Картинки, у '
+        'которых все миниатюры уже есть, пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+                            help='Сколько картинок обрабатывать параллельно '
+                                 '(по умолчанию THUMBNAIL_WORKERS)')
+
+    def handle(self, *args, **options):
+        names = (Post.objects.exclude(image='').order_by()
+                 .values_list('image', flat=True).distinct())
+        missing = [name for name in names.iterator()
+                   if not all(thumbnails.lookup(name, size)
+                              for size in settings.POST_THUMBNAILS)]
+        workers = options['workers'] or settings.THUMBNAIL_WORKERS
+        if workers > 1:
+            with ThreadPoolExecutor(workers) as executor:
+                list(executor.map(thumbnails.run, missing))
+        else:
+            for name in missing:
+                thumbnails.try_generate(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Миниатюры созданы для {len(missing)} картинок'))
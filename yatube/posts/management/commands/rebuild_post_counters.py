@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import PostCounter
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов всех авторов с нуля'
+
+    def handle(self, *args, **options):
+        PostCounter.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчиков пересчитано: {PostCounter.objects.count()}'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов (SQLite FTS5)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.has_index(connections[using]):
+            raise CommandError('В базе нет таблицы posts_post_fts: '
+                               'выполните migrate на SQLite.')
+        search.rebuild_index(using)
+        self.stdout.write(self.style.SUCCESS('Индекс поиска перестроен'))
@@ -0,0 +1,138 @@
+import datetime as dt
+import itertools
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts import search
+from posts.bulk import preserve_timestamps, refresh_after_bulk_insert
+from posts.models import Group, Post, User
+
+WORDS = (
+    'пингвин лёд антарктида море рыба снег ветер полярный день ночь '
+    'колония птенец перо клюв льдина берег кит тюлень волна холод '
+    'солнце айсберг экспедиция станция учёный фото блог новости '
+    'путешествие история'
+).split()
+
+
+def zipf_cum_weights(size, exponent):
+    """Накопленные веса для степенного распределения по рангу."""
+    weights = (1 / rank ** exponent for rank in range(1, size + 1))
+    return list(itertools.accumulate(weights))
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу пользователями, группами и постами для нагрузочных '
+        'тестов. Авторы и группы распределены по степенному закону: '
+        'немногие пишут и получают большую часть постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int,
+                            help='Зерно генератора для повторяемых данных')
+        parser.add_argument('--days', type=int, default=365,
+                            help='За сколько последних дней раскидать посты')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Показатель степенного распределения')
+        parser.add_argument('--no-group-share', type=float, default=0.2,
+                            help='Доля постов без группы')
+        parser.add_argument('--prefix', default='seed',
+                            help='Префикс имён пользователей и слагов групп')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        started = time.perf_counter()
+
+        user_ids = self.create_users(options['users'])
+        group_ids = self.create_groups(options['groups'])
+        created = self.create_posts(
+            options['posts'], user_ids, group_ids, options)
+        refresh_after_bulk_insert()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(user_ids)}, групп '
+            f'{len(group_ids)}, постов {created} за {elapsed:.1f} с '
+            f'({created / elapsed:.0f} постов/с)'))
+
+    def batches(self, objects):
+        iterator = iter(objects)
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def create_users(self, count):
+        password = make_password(None)
+        users = (User(username=f'{self.prefix}_user_{i}', password=password,
+                      first_name='Автор', last_name=str(i))
+                 for i in range(count))
+        for batch in self.batches(users):
+            User.objects.bulk_create(batch, ignore_conflicts=True)
+        # SQLite не возвращает первичные ключи из bulk_create
+        return list(User.objects.filter(
+            username__startswith=f'{self.prefix}_user_').order_by(
+            'pk').values_list('pk', flat=True))
+
+    def create_groups(self, count):
+        groups = (Group(title=f'Группа {i}', slug=f'{self.prefix}-group-{i}',
+                        description=f'Тестовая группа номер {i}')
+                  for i in range(count))
+        for batch in self.batches(groups):
+            Group.objects.bulk_create(batch, ignore_conflicts=True)
+        return list(Group.objects.filter(
+            slug__startswith=f'{self.prefix}-group-').order_by(
+            'pk').values_list('pk', flat=True))
+
+    def create_posts(self, count, user_ids, group_ids, options):
+        if not user_ids:
+            return 0
+        author_weights = zipf_cum_weights(len(user_ids), options['skew'])
+        group_weights = zipf_cum_weights(len(group_ids), options['skew'])
+        now = timezone.now()
+        span = options['days'] * 24 * 60 * 60
+        created = 0
+        with preserve_timestamps():
+            while created < count:
+                size = min(self.batch_size, count - created)
+                authors = self.random.choices(
+                    user_ids, cum_weights=author_weights, k=size)
+                groups = self.group_choices(
+                    group_ids, group_weights, size, options['no_group_share'])
+                posts = []
+                for author_id, group_id in zip(authors, groups):
+                    pub_date = now - dt.timedelta(
+                        seconds=self.random.uniform(0, span))
+                    posts.append(Post(text=self.text(), author_id=author_id,
+                                      group_id=group_id, pub_date=pub_date,
+                                      edited=pub_date))
+                with transaction.atomic(), search.deferred_indexing():
+                    Post.objects.bulk_create(posts)
+                created += size
+                self.stdout.write(f'Постов: {created}/{count}', ending='\r')
+        self.stdout.write('')
+        return created
+
+    def group_choices(self, group_ids, weights, size, no_group_share):
+        if not group_ids:
+            return [None] * size
+        groups = self.random.choices(group_ids, cum_weights=weights, k=size)
+        return [None if self.random.random() < no_group_share else group_id
+                for group_id in groups]
+
+    def text(self):
+        return ' '.join(self.random.choices(
+            WORDS, k=self.random.randint(5, 40))).capitalize()
@@ -0,0 +1,165 @@
+"""Материализованные ленты групп.
+
+Для каждой группы в кеше лежит список ключей (pub_date в микросекундах,
+id) её последних постов, не длиннее GROUP_FEED_SIZE. Список помечен
+версией области группы (см. caching), с которой он совпадает: первая
+страница группы строится из него одним запросом ``id__in``, а если
+версия разошлась — список собирается заново по индексу.
+
+Сигналы постов правят список на месте, только если он был актуален до
+их изменения; иначе удаляют его.
+"""
+import datetime as dt
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404
+
+from .caching import GROUP, feed_cache, key_part, request_version
+from .models import Group, Post
+from .paginators import EPOCH, KeysetPage, KeysetPaginator
+
+LOCK_TIMEOUT = 5
+
+
+def group_key(slug):
+    return f'group:{key_part(slug)}'
+
+
+def entries_key(group_id):
+    return f'group-feed:{group_id}'
+
+
+def lock_key(group_id):
+    return f'group-feed-lock:{group_id}'
+
+
+def feed_size():
+    # Список должен быть длиннее страницы, чтобы знать о следующей
+    return max(settings.GROUP_FEED_SIZE, settings.PAGE_SIZE + 1)
+
+
+def entry(pub_date, pk):
+    return (pub_date - EPOCH) // dt.timedelta(microseconds=1), pk
+
+
+def get_group(slug):
+    """Группа по слагу из кеша или из базы, иначе Http404.
+
+    Сигналы удаляют группу из кеша при сохранении, а срок хранения
+    ограничивает устаревание после правок мимо них (update, импорт, SQL).
+    """
+    cache = feed_cache()
+    group = cache.get(group_key(slug))
+    if group is None:
+        group = Group.objects.filter(slug=slug).first()
+        if group is None:
+            raise Http404('Нет такой группы')
+        cache.set(group_key(slug), group, settings.FEED_CACHE_TIMEOUT)
+    return group
+
+
+def forget_group(*slugs):
+    feed_cache().delete_many([group_key(slug) for slug in slugs])
+
+
+def build_entries(group_id, version):
+    size = feed_size()
+    # Список живёт до следующей записи в группу, поэтому читается из
+    # основной базы: отстающая реплика оставила бы его без новых постов
+    rows = (Post.objects.using(DEFAULT_DB_ALIAS).filter(group_id=group_id)
+            .order_by('-pub_date', '-pk')
+            .values_list('pub_date', 'pk')[:size + 1])
+    entries = [entry(pub_date, pk) for pub_date, pk in rows]
+    feed = {
+        'version': version,
+        'entries': entries[:size],
+        'complete': len(entries) <= size,
+    }
+    feed_cache().set(entries_key(group_id), feed, None)
+    return feed
+
+
+def get_entries(group, version):
+    feed = feed_cache().get(entries_key(group.pk))
+    if feed is None or feed['version'] != version:
+        feed = build_entries(group.pk, version)
+    return feed
+
+
+def first_page(request, group):
+    """Первая страница группы из материализованной ленты.
+
+    Для остальных страниц возвращает None: их отдаёт пагинатор по
+    индексу (group, pub_date, id).
+    """
+    params = request.GET
+    if params.get('after') or params.get('before') or (
+            params.get('page', '1') != '1'):
+        return None
+    per_page = settings.PAGE_SIZE
+    feed = get_entries(group, request_version(request, (GROUP, group.slug)))
+    ids = [pk for _, pk in feed['entries'][:per_page]]
+    posts = list(Post.objects.feed().filter(pk__in=ids))
+    if len(posts) != len(ids):
+        # Посты ушли мимо сигналов: список больше не верен
+        feed_cache().delete(entries_key(group.pk))
+        return None
+    paginator = KeysetPaginator(group.posts.feed(), per_page)
+    has_next = len(feed['entries']) > per_page or not feed['complete']
+    return KeysetPage(posts, paginator, has_next=has_next,
+                      has_previous=False, number=1)
+
+
+def update_entries(group_id, versions, post_id, pub_date, present):
+    """Переносит изменение поста в список группы.
+
+    versions — (версия до изменения, версия после) области группы;
+    present — должен ли пост теперь быть в ленте группы.
+    """
+    cache = feed_cache()
+    key = entries_key(group_id)
+    old_version, new_version = versions
+    if not cache.add(lock_key(group_id), 1, LOCK_TIMEOUT):
+        cache.delete(key)
+        return
+    try:
+        feed = cache.get(key)
+        if feed is None:
+            return
+        if feed['version'] != old_version:
+            cache.delete(key)
+            return
+        entries = [item for item in feed['entries'] if item[1] != post_id]
+        removed = len(entries) < len(feed['entries'])
+        complete = feed['complete']
+        item = entry(pub_date, post_id)
+        # Пост старше хвоста неполного списка в него не входит
+        if present and (complete or not entries or item > entries[-1]):
+            entries.append(item)
+            entries.sort(reverse=True)
+        elif removed and not complete:
+            # Из неполного списка нечем добрать хвост
+            cache.delete(key)
+            return
+        size = feed_size()
+        if len(entries) > size:
+            entries, complete = entries[:size], False
+        cache.set(key, {'version': new_version, 'entries': entries,
+                        'complete': complete}, None)
+    finally:
+        cache.delete(lock_key(group_id))
+
+
+def update_group_feeds(post_id, pub_date, current_group_id, touched, slugs):
+    """Обновляет списки групп, затронутых изменением поста.
+
+    current_group_id — группа поста после изменения (None, если он
+    удалён), touched — результат caching.touch, slugs — {id группы: слаг}.
+    """
+    for group_id, slug in slugs.items():
+        versions = touched.get((GROUP, slug))
+        if versions is None:
+            continue
+        update_entries(group_id, versions, post_id, pub_date,
+                       group_id == current_group_id)
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def edited_from_pub_date(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(edited=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='edited',
+            field=models.DateTimeField(auto_now=True, help_text='Обновляется при каждом сохранении поста', verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(edited_from_pub_date,
+                             migrations.RunPython.noop),
+    ]
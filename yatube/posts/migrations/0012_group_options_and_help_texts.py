@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-18 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_post_image'),
+    ]
+
+    # Подписи, help_text и опции отстали от моделей ещё до счётчика постов.
+    # В базе они ничего не меняют, а SQLite пересоздавал бы ради них
+    # таблицы постов и групп, поэтому меняется только состояние.
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterModelOptions(
+                name='group',
+                options={'verbose_name': 'Группа', 'verbose_name_plural': 'Группы'},
+            ),
+            migrations.AlterField(
+                model_name='group',
+                name='description',
+                field=models.TextField(help_text='Добавьте описание', verbose_name='Описание'),
+            ),
+            migrations.AlterField(
+                model_name='group',
+                name='slug',
+                field=models.SlugField(help_text='Добавьте слаг', unique=True, verbose_name='Слаг'),
+            ),
+            migrations.AlterField(
+                model_name='group',
+                name='title',
+                field=models.CharField(help_text='Добавьте название группы', max_length=200, verbose_name='Группа'),
+            ),
+            migrations.AlterField(
+                model_name='post',
+                name='author',
+                field=models.ForeignKey(help_text='Впишите имя автора поста', on_delete=django.db.models.deletion.CASCADE, related_name='posts', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+            ),
+            migrations.AlterField(
+                model_name='post',
+                name='group',
+                field=models.ForeignKey(blank=True, help_text='Выберите группу', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='posts', to='posts.Group', verbose_name='Группа'),
+            ),
+            migrations.AlterField(
+                model_name='post',
+                name='pub_date',
+                field=models.DateTimeField(auto_now_add=True, help_text='Добавьте дату публикации', verbose_name='Дата публикации'),
+            ),
+            migrations.AlterField(
+                model_name='post',
+                name='text',
+                field=models.TextField(help_text='Введите тест поста', verbose_name='Текст поста'),
+            ),
+        ]),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import Case, Count, F, Value, When
 
 User = get_user_model()
 
@@ -19,6 +20,25 @@ class Group(models.Model):
         verbose_name_plural = 'Группы'
 
 
+class PostQuerySet(models.QuerySet):
+    feed_fields = (
+        'text',
+        'pub_date',
+        'edited',
+        'author__username',
+        'author__first_name',
+        'author__last_name',
+        'group__title',
+        'group__slug',
+        'image',
+    )
+
+    def feed(self):
+        """Посты для лент: автор и группа одним запросом,
+        без колонок, которые шаблоны лент не выводят."""
+        return self.select_related('author', 'group').only(*self.feed_fields)
+
+
 class Post(models.Model):
     text = models.TextField('Текст поста',
                             blank=False,
@@ -26,6 +46,10 @@ class Post(models.Model):
     pub_date = models.DateTimeField('Дата публикации',
                                     auto_now_add=True,
                                     help_text='Добавьте дату публикации')
+    edited = models.DateTimeField('Дата изменения',
+                                  auto_now=True,
+                                  help_text='Обновляется при каждом '
+                                            'сохранении поста')
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -42,10 +66,118 @@ class Post(models.Model):
         verbose_name='Группа',
         help_text='Выберите группу')
 
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+        help_text='Загрузите картинку')
+
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         return self.text[:15]
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_pub_date_idx'),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+
+
+class PostCounterManager(models.Manager):
+    # Параметров на автора в UPDATE из add_many: WHEN user_id = %s
+    # THEN %s и ещё один в IN
+    params_per_user = 3
+
+    def batch_size(self):
+        """Авторов в одном UPDATE: число параметров запроса ограничено
+        (999 у SQLite до 3.32)."""
+        max_params = connections[self.db].features.max_query_params
+        return (max_params or 3000) // self.params_per_user
+
+    def change(self, user_id, delta):
+        """Атомарно сдвигает счётчик постов автора на delta.
+
+        Ниже нуля счётчик не уходит: разошедшийся с таблицей счётчик или
+        повторное удаление поста (post_delete приходит и тогда, когда
+        строки уже нет) не должны ронять удаление на CHECK-ограничении.
+        """
+        counters = self.filter(user_id=user_id)
+        if delta < 0:
+            updated = counters.filter(posts_count__gte=-delta).update(
+                posts_count=F('posts_count') + delta)
+            if not updated:
+                counters.update(posts_count=0)
+            return
+        if counters.update(posts_count=F('posts_count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, posts_count=delta)
+        except IntegrityError:
+            counters.update(posts_count=F('posts_count') + delta)
+
+    def add_many(self, counts):
+        """Прибавляет {id автора: число постов} одним UPDATE на пачку
+        авторов и создаёт недостающие счётчики одним INSERT."""
+        user_ids = list(counts)
+        existing = set()
+        batch_size = self.batch_size()
+        for start in range(0, len(user_ids), batch_size):
+            chunk = user_ids[start:start + batch_size]
+            found = list(self.filter(user_id__in=chunk).values_list(
+                'user_id', flat=True))
+            if not found:
+                continue
+            existing.update(found)
+            delta = Case(
+                *(When(user_id=user_id, then=Value(counts[user_id]))
+                  for user_id in found),
+                output_field=models.PositiveIntegerField())
+            self.filter(user_id__in=found).update(
+                posts_count=F('posts_count') + delta)
+        self.bulk_create(
+            self.model(user_id=user_id, posts_count=count)
+            for user_id, count in counts.items() if user_id not in existing)
+
+    def rebuild(self):
+        """Пересчитывает все счётчики по таблице постов."""
+        counts = (Post.objects.order_by()
+                  .values_list('author')
+                  .annotate(posts_count=Count('pk')))
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                (self.model(user_id=user_id, posts_count=posts_count)
+                 for user_id, posts_count in counts.iterator()))
+
+
+class PostCounter(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+        verbose_name='Автор')
+    posts_count = models.PositiveIntegerField('Всего постов', default=0)
+
+    objects = PostCounterManager()
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts_count}'
+
+    @classmethod
+    def for_user(cls, user):
+        counter = getattr(user, 'post_counter', None)
+        return counter.posts_count if counter else 0
+
+    class Meta:
+        verbose_name = 'Счётчик постов'
+        verbose_name_plural = 'Счётчики постов'
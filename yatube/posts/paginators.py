@@ -0,0 +1,151 @@
+import datetime as dt
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q
+
+EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+LAST_PAGE = 'last'
+
+
+def encode_cursor(pub_date, pk):
+    """Упаковывает ключ (pub_date, id) в строку для ссылки."""
+    micros = (pub_date - EPOCH) // dt.timedelta(microseconds=1)
+    return f'{micros}_{pk}'
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор из ссылки обратно в (pub_date, id)."""
+    try:
+        micros, pk = cursor.split('_')
+        return EPOCH + dt.timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        raise PageNotAnInteger('Неверный курсор страницы')
+
+
+class KeysetPage(Page):
+    """Страница, которая знает о соседях, но не об их количестве."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous,
+                 number=None):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        last = self.object_list[-1]
+        return encode_cursor(last.pub_date, last.pk)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        first = self.object_list[0]
+        return encode_cursor(first.pub_date, first.pk)
+
+
+class KeysetPaginator(Paginator):
+    """Пагинатор по ключу (pub_date, id).
+
+    Следующая и предыдущая страницы выбираются условием по ключу
+    последнего/первого поста, поэтому запрос не делает ни COUNT, ни
+    OFFSET и стоит одинаково на любой глубине. Старые ссылки вида
+    ``?page=N`` продолжают работать через OFFSET.
+    """
+    ordering = ('-pub_date', '-pk')
+
+    def __init__(self, object_list, per_page):
+        super().__init__(object_list.order_by(*self.ordering), per_page)
+
+    def validate_number(self, number):
+        if number == LAST_PAGE:
+            return number
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не является числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def get_page(self, number=None, after=None, before=None):
+        try:
+            if after:
+                return self.page_after(after)
+            if before:
+                return self.page_before(before)
+            return self.page(number or 1)
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            return self.last_page()
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if number == LAST_PAGE:
+            return self.last_page()
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('На этой странице нет результатов')
+        return self._page(rows, has_previous=number > 1, number=number)
+
+    def older(self, cursor):
+        """Посты после курсора в порядке ленты."""
+        pub_date, pk = decode_cursor(cursor)
+        return self.object_list.filter(
+            Q(pub_date__lte=pub_date),
+            Q(pub_date__lt=pub_date) | Q(pk__lt=pk),
+        )
+
+    def newer(self, cursor):
+        """Посты перед курсором в обратном порядке."""
+        pub_date, pk = decode_cursor(cursor)
+        return self.object_list.filter(
+            Q(pub_date__gte=pub_date),
+            Q(pub_date__gt=pub_date) | Q(pk__gt=pk),
+        ).reverse()
+
+    def page_after(self, cursor):
+        rows = list(self.older(cursor)[:self.per_page + 1])
+        if not rows:
+            raise EmptyPage('На этой странице нет результатов')
+        return self._page(rows, has_previous=True)
+
+    def page_before(self, cursor):
+        rows = list(self.newer(cursor)[:self.per_page + 1])
+        if len(rows) <= self.per_page:
+            return self.page(1)
+        rows = rows[:self.per_page][::-1]
+        return KeysetPage(rows, self, has_next=True, has_previous=True)
+
+    def last_page(self):
+        rows = list(self.object_list.reverse()[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return KeysetPage(rows, self, has_next=False,
+                          has_previous=has_previous)
+
+    def _page(self, rows, has_previous, number=None):
+        return KeysetPage(rows[:self.per_page], self,
+                          has_next=len(rows) > self.per_page,
+                          has_previous=has_previous, number=number)
+
+
+def get_page_obj(request, post_list):
+    """Возвращает страницу ленты по параметрам запроса."""
+    paginator = KeysetPaginator(post_list, settings.PAGE_SIZE)
+    return paginator.get_page(
+        request.GET.get('page'),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
@@ -0,0 +1,176 @@
+import re
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.transaction import TransactionManagementError
+
+from .models import Group, Post, User
+
+# SQLite пересоздаёт таблицу posts_post при изменении её полей в
+# миграциях и теряет при этом триггеры, поэтому они доустанавливаются
+# после каждого migrate.
+INSERT_TRIGGER_SQL = """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END
+"""
+TRIGGERS_SQL = [
+    INSERT_TRIGGER_SQL,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+]
+
+SEARCH_SQL = """
+    SELECT post.id
+    FROM posts_post_fts
+    JOIN posts_post AS post ON post.id = posts_post_fts.rowid
+    WHERE posts_post_fts MATCH %s {filters}
+    ORDER BY posts_post_fts.rank
+    LIMIT %s OFFSET %s
+"""
+GROUP_FILTER_SQL = (
+    'AND post.group_id = '
+    f'(SELECT id FROM {Group._meta.db_table} WHERE slug = %s)')
+AUTHOR_FILTER_SQL = (
+    'AND post.author_id = '
+    f'(SELECT id FROM {User._meta.db_table} WHERE username = %s)')
+
+MATCH_IDS_SQL = (
+    'SELECT rowid FROM posts_post_fts WHERE posts_post_fts MATCH %s')
+
+TERM_RE = re.compile(r'(\w+)(\*?)')
+
+
+def has_index(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master "
+                       "WHERE type = 'table' AND name = 'posts_post_fts'")
+        return cursor.fetchone() is not None
+
+
+def install_triggers(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if not has_index(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in TRIGGERS_SQL:
+            cursor.execute(statement)
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS):
+    """Перестраивает индекс целиком по таблице постов."""
+    install_triggers(using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')")
+        cursor.execute(
+            "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('optimize')")
+
+
+@contextmanager
+def deferred_indexing(using=DEFAULT_DB_ALIAS):
+    """Индексирует посты, вставленные внутри блока, одним запросом.
+
+    Триггер вставки снимается на время блока, а в конце все посты с id
+    больше прежнего максимума попадают в индекс через INSERT ... SELECT
+    и триггер ставится обратно. Нужна открытая транзакция: DDL в SQLite
+    транзакционный, и другие соединения пропажи триггера не увидят.
+    """
+    connection = connections[using]
+    if not has_index(connection):
+        yield
+        return
+    if not connection.in_atomic_block:
+        raise TransactionManagementError(
+            'deferred_indexing работает только внутри транзакции')
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM posts_post')
+        last_id, = cursor.fetchone()
+        cursor.execute('DROP TRIGGER IF EXISTS posts_post_fts_insert')
+    yield
+    with connection.cursor() as cursor:
+        cursor.execute('INSERT INTO posts_post_fts(rowid, text) '
+                       'SELECT id, text FROM posts_post WHERE id > %s',
+                       [last_id])
+        cursor.execute(INSERT_TRIGGER_SQL)
+
+
+def match_expression(query):
+    """Превращает запрос посетителя в выражение FTS5.
+
+    Каждое слово берётся в кавычки, чтобы операторы FTS5 из ввода не
+    работали; ``слово*`` ищет по префиксу. Все слова обязательны.
+    """
+    terms = [f'"{word}"{star}' for word, star in TERM_RE.findall(query)]
+    return ' '.join(terms)
+
+
+def search_posts(query, group=None, author=None, limit=10, offset=0):
+    """Посты, подходящие под запрос, от самых релевантных.
+
+    group и author — слаг группы и имя автора для фильтрации.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return []
+    using = router.db_for_read(Post)
+    connection = connections[using]
+    if not has_index(connection):
+        return list(fallback_search(query, group, author).using(using)
+                    [offset:offset + limit])
+    filters, params = [], [expression]
+    if group:
+        filters.append(GROUP_FILTER_SQL)
+        params.append(group)
+    if author:
+        filters.append(AUTHOR_FILTER_SQL)
+        params.append(author)
+    params.extend([limit, offset])
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL.format(filters=' '.join(filters)), params)
+        ids = [row[0] for row in cursor.fetchall()]
+    posts = Post.objects.using(using).feed().in_bulk(ids)
+    return [posts[pk] for pk in ids if pk in posts]
+
+
+def filter_matching(posts, query):
+    """Оставляет в выборке постов подходящие под запрос, без ранжирования."""
+    expression = match_expression(query)
+    if not expression:
+        return posts
+    if not has_index(connections[posts.db]):
+        for word, _ in TERM_RE.findall(query):
+            posts = posts.filter(text__icontains=word)
+        return posts
+    # RawSQL в pk__in обернулся бы в лишние скобки, и SQLite взял бы
+    # из подзапроса только первую строку
+    return posts.extra(
+        where=[f'{Post._meta.db_table}.id IN ({MATCH_IDS_SQL})'],
+        params=[expression])
+
+
+def fallback_search(query, group=None, author=None):
+    posts = Post.objects.feed()
+    for word, _ in TERM_RE.findall(query):
+        posts = posts.filter(text__icontains=word)
+    if group:
+        posts = posts.filter(group__slug=group)
+    if author:
+        posts = posts.filter(author__username=author)
+    return posts
@@ -0,0 +1,125 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import materialized, search, thumbnails
+from .caching import (CARDS, GROUP, PROFILE, expire_on_commit,
+                      expire_post_feeds, touch, touch_on_commit)
+from .models import Group, Post, PostCounter, User
+
+
+def remember_loaded(instance):
+    # Через __dict__, чтобы не подгружать отложенные поля лишним запросом.
+    instance._loaded_author_id = instance.__dict__.get('author_id')
+    instance._loaded_group_id = instance.__dict__.get('group_id')
+    image = instance.__dict__.get('image')
+    instance._loaded_image = getattr(image, 'name', image)
+
+
+def expire_feeds(post, author_ids, group_ids, created=False, deleted=False):
+    """Вытесняет ленты поста, в том числе после фиксации транзакции.
+
+    Имена и слаги читаются сразу: к фиксации автор или группа уже могут
+    быть удалены, а у удалённого поста — сброшен pk.
+    """
+    usernames = list(User.objects.filter(
+        pk__in=author_ids).values_list('username', flat=True))
+    slugs = dict(Group.objects.filter(
+        pk__in=group_ids).values_list('pk', 'slug'))
+    post_id, pub_date = post.pk, post.pub_date
+    group_id = None if deleted else post.group_id
+
+    def expire():
+        touched = expire_post_feeds(usernames, slugs.values(),
+                                    created=created)
+        materialized.update_group_feeds(post_id, pub_date, group_id,
+                                        touched, slugs)
+    expire_on_commit(expire)
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    remember_loaded(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_author_id = instance._loaded_author_id
+    if created:
+        PostCounter.objects.change(instance.author_id, 1)
+    elif old_author_id != instance.author_id:
+        PostCounter.objects.change(old_author_id, -1)
+        PostCounter.objects.change(instance.author_id, 1)
+    expire_feeds(
+        instance,
+        {old_author_id, instance.author_id} - {None},
+        {instance._loaded_group_id, instance.group_id} - {None},
+        created=created,
+    )
+    if instance.image and instance.image.name != instance._loaded_image:
+        thumbnails.schedule(instance.image.name)
+    remember_loaded(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    PostCounter.objects.change(instance.author_id, -1)
+    expire_feeds(instance, {instance.author_id},
+                 {instance.group_id} - {None}, deleted=True)
+
+
+@receiver(post_init, sender=Group)
+def group_loaded(sender, instance, **kwargs):
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Старый слаг тоже: его закешированные страницы должны стать 404
+    slugs = {instance._loaded_slug, instance.slug} - {None}
+
+    def expire():
+        touch((CARDS,), *((GROUP, slug) for slug in slugs))
+        materialized.forget_group(*slugs)
+    expire_on_commit(expire)
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    slug = instance.slug
+    # Посты группы остаются без неё, но их карточки об этом не знают
+    touch_on_commit((CARDS,))
+    expire_on_commit(lambda: materialized.forget_group(slug))
+
+
+def profile_fields(instance):
+    # Через __dict__, как в remember_loaded
+    return tuple(instance.__dict__.get(name)
+                 for name in ('username', 'first_name', 'last_name'))
+
+
+@receiver(post_init, sender=User)
+def user_loaded(sender, instance, **kwargs):
+    instance._loaded_profile = profile_fields(instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    """Имя пользователя есть в его профиле, лентах и карточках постов.
+
+    Сохранение при каждом входе (last_login) их не касается.
+    """
+    loaded = instance._loaded_profile
+    if raw or created or profile_fields(instance) == loaded:
+        return
+    usernames = {loaded[0], instance.username} - {None}
+    touch_on_commit((CARDS,), *((PROFILE, username) for username in usernames))
+    instance._loaded_profile = profile_fields(instance)
+
+
+def install_search_triggers(sender, using, **kwargs):
+    search.install_triggers(using)
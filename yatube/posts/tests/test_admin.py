@@ -0,0 +1,84 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.paginators import EstimatedCountPaginator
+
+from ..admin import GroupAdmin
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.old_post = Post.objects.create(
+            author=cls.user, text='Старый пост про пингвинов',
+            group=cls.group)
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now().replace(year=2015, month=3))
+        cls.new_post = Post.objects.create(author=cls.user,
+                                           text='Свежий пост')
+
+    def setUp(self) -> None:
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin_user)
+
+    def changelist(self, **params):
+        response = self.admin_client.get(
+            reverse('admin:posts_post_changelist'), params)
+        return list(response.context['cl'].result_list)
+
+    def test_changelist_shows_all_posts(self):
+        self.assertEqual(self.changelist(), [self.new_post, self.old_post])
+
+    def test_filter_by_year_and_month(self):
+        self.assertEqual(self.changelist(published='2015'), [self.old_post])
+        self.assertEqual(self.changelist(published='2015-03'),
+                         [self.old_post])
+        self.assertEqual(self.changelist(published='2015-04'), [])
+
+    def test_bad_period_leaves_filter_unset(self):
+        for value in ('0', '99999', '9999-12', '2015-13', '2015-00',
+                      'abc', '2015-x'):
+            with self.subTest(published=value):
+                self.assertEqual(self.changelist(published=value),
+                                 [self.new_post, self.old_post])
+
+    def test_search_uses_full_text_index(self):
+        self.assertEqual(self.changelist(q='пингвинов'), [self.old_post])
+
+    def test_group_admin_is_registered(self):
+        self.assertIsInstance(admin.site._registry[Group], GroupAdmin)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username='auth')
+        for i in range(5):
+            Post.objects.create(author=user, text=f'Пост {i}')
+
+    def test_unfiltered_count_is_estimated_by_id(self):
+        Post.objects.order_by('pk').first().delete()
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertEqual(paginator.count, Post.objects.latest('pk').pk)
+
+    def test_filtered_count_is_capped(self):
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(text__startswith='Пост'), 2)
+        paginator.count_limit = 3
+        self.assertEqual(paginator.count, 3)
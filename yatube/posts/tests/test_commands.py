@@ -0,0 +1,205 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from core.tests.utils import TempDirMixin
+
+from .. import thumbnails
+from ..models import Group, Post, PostCounter, User
+from ..search import search_posts
+from .test_forms import SMALL_GIF
+
+
+class SeedYatubeCommandTest(TestCase):
+    def seed(self, **options):
+        call_command('seed_yatube', users=5, groups=3, posts=60,
+                     batch_size=25, seed=1, stdout=StringIO(), **options)
+
+    def test_creates_requested_rows(self):
+        self.seed()
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 60)
+
+    def test_counters_match_posts(self):
+        self.seed()
+        counts = dict(Post.objects.order_by().values_list('author')
+                      .annotate(Count('pk')))
+        self.assertEqual(
+            dict(PostCounter.objects.values_list('user', 'posts_count')),
+            counts)
+
+    def test_pub_dates_are_spread(self):
+        self.seed(days=30)
+        self.assertGreater(
+            Post.objects.values('pub_date').distinct().count(), 50)
+
+    def test_same_seed_gives_same_texts(self):
+        self.seed()
+        texts = list(Post.objects.order_by('pk').values_list('text'))
+        Post.objects.all().delete()
+        self.seed()
+        self.assertEqual(
+            list(Post.objects.order_by('pk').values_list('text')), texts)
+
+
+class ExportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=cls.user, text='С группой',
+                            group=cls.group)
+        Post.objects.create(author=cls.user, text='Без группы')
+
+    def export(self, **options):
+        out = StringIO()
+        call_command('export_posts', chunk_size=1, stdout=out, **options)
+        return out.getvalue()
+
+    def test_ndjson_has_a_line_per_post(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual([row['text'] for row in rows],
+                         ['С группой', 'Без группы'])
+        self.assertEqual(rows[0]['author'], 'auth')
+        self.assertEqual(rows[0]['group'], 'test-slug')
+        self.assertIsNone(rows[1]['group'])
+
+    def test_csv_has_header(self):
+        rows = list(csv.DictReader(StringIO(self.export(format='csv'))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['group_title'], 'Тестовая группа')
+
+    def test_csv_escapes_formulas(self):
+        Post.objects.create(author=self.user, text='=HYPERLINK("x")')
+        Post.objects.create(author=self.user, text="'цитата")
+        rows = list(csv.DictReader(StringIO(self.export(format='csv'))))
+        self.assertEqual([row['text'] for row in rows[2:]],
+                         ['\'=HYPERLINK("x")', "''цитата"])
+
+
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'posts.ndjson')
+
+    def write(self, rows):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def run_import(self, **options):
+        call_command('import_posts', self.path, batch_size=2,
+                     stdout=StringIO(), **options)
+
+    def test_imports_posts_with_counters_and_search(self):
+        self.write([
+            {'text': 'Импортированные пингвины', 'author': 'auth',
+             'group': 'test-slug', 'pub_date': '2020-01-01T10:00:00+00:00'},
+            {'text': 'Второй пост', 'author': 'auth'},
+            {'text': 'Третий пост', 'author': 'auth', 'group': ''},
+        ])
+        self.run_import()
+        post = Post.objects.get(text='Импортированные пингвины')
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(post.pub_date.year, 2020)
+        self.assertEqual(PostCounter.objects.get(user=self.user).posts_count,
+                         3)
+        self.assertEqual(search_posts('пингвины'), [post])
+
+    def test_csv_formula_escaping_is_removed(self):
+        self.path = os.path.join(self.directory.name, 'posts.csv')
+        with open(self.path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['text', 'author'])
+            writer.writerow(["'=1+1", 'auth'])
+        self.run_import()
+        self.assertEqual(Post.objects.get().text, '=1+1')
+
+    def test_unknown_author_or_group_is_skipped(self):
+        self.write([
+            {'text': 'Чужой автор', 'author': 'nobody'},
+            {'text': 'Чужая группа', 'author': 'auth', 'group': 'nowhere'},
+        ])
+        self.run_import()
+        self.assertFalse(Post.objects.exists())
+
+    def test_create_missing_author_and_group(self):
+        self.write([{'text': 'Новый автор', 'author': 'newcomer',
+                     'group': 'new-slug', 'group_title': 'Новая группа'}])
+        self.run_import(create_missing=True)
+        post = Post.objects.get()
+        self.assertEqual(post.author.username, 'newcomer')
+        self.assertEqual(post.group.title, 'Новая группа')
+
+    def test_resumes_from_checkpoint(self):
+        self.write([{'text': f'Пост {i}', 'author': 'auth'}
+                    for i in range(5)])
+        self.run_import()
+        self.run_import()
+        self.assertEqual(Post.objects.count(), 5)
+        # Пачка успела сохраниться, а итог в контрольную точку — нет
+        Post.objects.filter(text='Пост 4').delete()
+        last_id = Post.objects.latest('pk').pk
+        Post.objects.create(author=self.user, text='Пост 4')
+        with open(self.path + '.checkpoint', 'w') as file:
+            json.dump({'rows': 4, 'last_id': last_id, 'pending': 5}, file)
+        self.run_import()
+        self.assertEqual(Post.objects.count(), 5)
+
+
+class PrewarmThumbnailsCommandTest(TempDirMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('small.gif', SMALL_GIF,
+                                     content_type='image/gif'),
+        )
+        Post.objects.create(author=cls.user, text='Без картинки')
+
+    def setUp(self):
+        cache.clear()
+
+    def prewarm(self):
+        out = StringIO()
+        call_command('prewarm_thumbnails', workers=1, stdout=out)
+        return out.getvalue()
+
+    def test_creates_every_size(self):
+        self.assertIsNone(thumbnails.lookup(self.post.image, 'feed'))
+        self.assertIn('для 1 картинок', self.prewarm())
+        for size in settings.POST_THUMBNAILS:
+            self.assertIsNotNone(thumbnails.lookup(self.post.image, size))
+
+    def test_skips_ready_images(self):
+        self.prewarm()
+        self.assertIn('для 0 картинок', self.prewarm())
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(SYNDICATION_SIZE=3)
+class SyndicationFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(4):
+            Post.objects.create(author=cls.user, text=f'Пост {number}',
+                                group=cls.group)
+        Post.objects.create(author=cls.other, text='Пост без группы')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_contain_latest_posts(self):
+        feeds = {
+            reverse('posts:index_rss'): ['Пост без группы', 'Пост 3'],
+            reverse('posts:group_atom', args=['test-slug']): ['Пост 3'],
+            reverse('posts:profile_rss', args=['other']): [
+                'Пост без группы'],
+        }
+        for url, texts in feeds.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                for text in texts:
+                    self.assertContains(response, text)
+                self.assertNotContains(response, 'Пост 0')
+
+    def test_atom_content_type(self):
+        response = self.guest_client.get(reverse('posts:index_atom'))
+        self.assertTrue(
+            response['Content-Type'].startswith('application/atom+xml'))
+
+    def test_unknown_group_is_404(self):
+        response = self.guest_client.get(
+            reverse('posts:group_rss', args=['nope']))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_repeated_poll_is_not_modified(self):
+        url = reverse('posts:group_rss', args=['test-slug'])
+        response = self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_feed_is_served_from_cache(self):
+        url = reverse('posts:index_rss')
+        self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertContains(response, 'Пост 3')
+
+    def test_new_post_in_scope_refreshes_feed(self):
+        url = reverse('posts:profile_rss', args=['other'])
+        self.guest_client.get(url)
+        Post.objects.create(author=self.other, text='Свежий пост')
+        self.assertContains(self.guest_client.get(url), 'Свежий пост')
+
+    def test_group_rename_refreshes_feed_categories(self):
+        url = reverse('posts:index_rss')
+        etag = self.guest_client.get(url)['ETag']
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Новое название')
+        self.assertNotContains(response, 'Тестовая группа')
+
+    def test_author_name_change_refreshes_feed_title(self):
+        url = reverse('posts:profile_atom', args=['other'])
+        self.guest_client.get(url)
+        self.other.first_name = 'Другой'
+        self.other.save()
+        self.assertContains(self.guest_client.get(url), 'Yatube: посты Другой')
@@ -1,11 +1,23 @@
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase
 from django.urls import reverse
 
+from core.tests.utils import TempDirMixin
+
 from ..models import Post, User
 
 User = get_user_model()
 
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
 
 class PostCreateFormTests(TestCase):
     post_text_new = 'Текст для теста test_new_post_created_in_database'
@@ -80,3 +92,34 @@ class PostCreateFormTests(TestCase):
                          self.post_text_edited)
         self.assertEqual(post.author.username,
                          self.post_author)
+
+
+class PostImageFormTests(TempDirMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self) -> None:
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_post_with_image_created_in_database(self):
+        uploaded = SimpleUploadedFile('small.gif', SMALL_GIF,
+                                      content_type='image/gif')
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с картинкой', 'image': uploaded},
+        )
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertEqual(post.image.name, 'posts/small.gif')
+
+    def test_not_an_image_is_rejected(self):
+        uploaded = SimpleUploadedFile('small.gif', b'not an image',
+                                      content_type='image/gif')
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с картинкой', 'image': uploaded},
+        )
+        self.assertIn('image', response.context['form'].errors)
+        self.assertFalse(Post.objects.exists())
@@ -1,7 +1,12 @@
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import Group, Post, PostCounter
 
 User = get_user_model()
 
@@ -85,3 +90,56 @@ class PostModelTest(TestCase):
             with self.subTest(field=field_key):
                 self.assertEqual(
                     post._meta.get_field(field_key).help_text, expected_value)
+
+
+class PostCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other_user = User.objects.create_user(username='other')
+
+    def posts_count(self, user):
+        return PostCounter.objects.get(user=user).posts_count
+
+    def test_counter_follows_created_and_deleted_posts(self):
+        post = Post.objects.create(author=self.user, text='Тестовый текст')
+        Post.objects.create(author=self.user, text='Тестовый текст')
+        self.assertEqual(self.posts_count(self.user), 2)
+        post.delete()
+        self.assertEqual(self.posts_count(self.user), 1)
+
+    def test_counter_follows_author_change(self):
+        post = Post.objects.create(author=self.user, text='Тестовый текст')
+        post = Post.objects.get(pk=post.pk)
+        post.author = self.other_user
+        post.save()
+        self.assertEqual(self.posts_count(self.user), 0)
+        self.assertEqual(self.posts_count(self.other_user), 1)
+
+    def test_counter_does_not_go_below_zero(self):
+        post = Post.objects.create(author=self.user, text='Тестовый текст')
+        PostCounter.objects.update(posts_count=0)
+        post.delete()
+        self.assertEqual(self.posts_count(self.user), 0)
+
+    def test_rebuild_command_restores_counters(self):
+        Post.objects.create(author=self.user, text='Тестовый текст')
+        PostCounter.objects.update(posts_count=100)
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertEqual(self.posts_count(self.user), 1)
+        self.assertFalse(
+            PostCounter.objects.filter(user=self.other_user).exists())
+
+    def test_add_many_fits_query_parameter_limit(self):
+        users = [self.user, self.other_user] + [
+            User.objects.create_user(username=f'user{number}')
+            for number in range(3)]
+        PostCounter.objects.bulk_create(
+            PostCounter(user=user, posts_count=1) for user in users[:4])
+        with mock.patch.object(connection.features, 'max_query_params', 9):
+            self.assertEqual(PostCounter.objects.batch_size(), 3)
+            PostCounter.objects.add_many(
+                {user.pk: number for number, user in enumerate(users, 1)})
+        self.assertEqual([self.posts_count(user) for user in users],
+                         [2, 3, 4, 5, 5])
@@ -1,9 +1,21 @@
+from http import HTTPStatus
+
 from django import forms
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core.routers import replica_reads
+from core.tests.utils import TempDirMixin
+
+from .. import materialized, thumbnails
+from ..caching import GROUP, version_key
 from ..models import Group, Post
+from .test_forms import SMALL_GIF
 
 User = get_user_model()
 
@@ -31,6 +43,7 @@ class PostPagesTests(TestCase):
         )
 
     def setUp(self) -> None:
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -178,6 +191,37 @@ class PaginatorViewsTest(TestCase):
             reverse('posts:profile', kwargs={'username': 'auth'}) + '?page=2')
         self.assertEqual(len(response.context['page_obj']), self.three_posts)
 
+    def test_next_cursor_page_contains_three_records(self):
+        first_page = self.authorized_client.get(
+            reverse('posts:index')).context['page_obj']
+        response = self.authorized_client.get(
+            reverse('posts:index') + '?after=' + first_page.next_cursor)
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), self.three_posts)
+        self.assertFalse(page_obj.has_next())
+        self.assertNotIn(page_obj[0], list(first_page))
+
+    def test_previous_cursor_returns_first_page(self):
+        last_page = self.authorized_client.get(
+            reverse('posts:index') + '?page=last').context['page_obj']
+        response = self.authorized_client.get(
+            reverse('posts:index') + '?before='
+            + last_page.previous_cursor)
+        self.assertEqual(len(response.context['page_obj']), self.ten_posts)
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        response = self.authorized_client.get(
+            reverse('posts:index') + '?after=broken')
+        self.assertEqual(len(response.context['page_obj']), self.ten_posts)
+
+    def test_feed_pages_do_not_count_posts(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(
+                reverse('posts:group_list', kwargs={'slug': 'test-slug'}))
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
+
 
 class PostIntegrationViewsTests(TestCase):
     post_text = 'Тестовый текст'
@@ -225,3 +269,495 @@ class PostIntegrationViewsTests(TestCase):
                          self.post_text)
         self.assertEqual(response_profile.context['page_obj'][0].text,
                          self.post_text)
+
+
+class FeedQueriesTests(TestCase):
+    posts_on_page = 10
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for i in range(cls.posts_on_page):
+            other_author = User.objects.create_user(
+                username=f'author{i}', first_name='Имя', last_name=str(i))
+            other_group = Group.objects.create(
+                title=f'Группа {i}',
+                slug=f'group-{i}',
+                description='Тестовое описание',
+            )
+            Post.objects.create(author=other_author, text='Тестовый текст',
+                                group=other_group)
+            Post.objects.create(author=cls.author, text='Тестовый текст',
+                                group=cls.group)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feed_pages_query_count(self):
+        pages_queries = {
+            reverse('posts:index'): 1,
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}): 3,
+            reverse('posts:profile', kwargs={'username': 'auth'}): 2,
+        }
+        for url, queries in pages_queries.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    response = self.guest_client.get(url)
+                self.assertEqual(len(response.context['page_obj']),
+                                 self.posts_on_page)
+
+
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(author=cls.user,
+                                       text='Тестовый текст',
+                                       group=cls.group)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_anonymous_feed_is_served_from_cache(self):
+        url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        response = self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            cached_response = self.guest_client.get(url)
+        self.assertEqual(cached_response.content, response.content)
+
+    def test_authorized_feed_is_not_cached(self):
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        response = self.authorized_client.get(url)
+        self.assertIsNotNone(response.context)
+
+    def test_new_post_expires_only_affected_feeds(self):
+        index_url = reverse('posts:index')
+        group_url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        other_url = reverse('posts:group_list',
+                            kwargs={'slug': 'other-slug'})
+        for url in (index_url, group_url, other_url):
+            self.guest_client.get(url)
+        Post.objects.create(author=self.user, text='Новый пост',
+                            group=self.group)
+        self.assertContains(self.guest_client.get(index_url), 'Новый пост')
+        self.assertContains(self.guest_client.get(group_url), 'Новый пост')
+        with self.assertNumQueries(0):
+            self.guest_client.get(other_url)
+
+    def test_group_change_expires_old_group(self):
+        group_url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        self.assertContains(self.guest_client.get(group_url),
+                            'Тестовый текст')
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Тестовый текст', 'group': self.other_group.pk},
+        )
+        self.assertNotContains(self.guest_client.get(group_url),
+                               'Тестовый текст')
+
+    def test_page_cached_before_commit_expires_on_commit(self):
+        url = reverse('posts:index')
+        Post.objects.create(author=self.user, text='Новый пост')
+        # Страница, закешированная между записью и фиксацией
+        self.guest_client.get(url)
+        callbacks, connection.run_on_commit = connection.run_on_commit, []
+        for _, callback in callbacks:
+            callback()
+        response = self.guest_client.get(url)
+        self.assertIsNotNone(response.context)
+
+    @override_settings(FEED_VERSION_TIMEOUT=0)
+    def test_versions_of_unknown_scopes_expire(self):
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'nope'}))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertIsNone(cache.get(version_key((GROUP, 'nope'))))
+
+    def test_cache_keys_are_ascii(self):
+        for key in (version_key((GROUP, 'группа тест')),
+                    materialized.group_key('группа тест')):
+            self.assertTrue(key.isascii() and ' ' not in key)
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user,
+                                       text='Тестовый текст')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_post_card_is_rendered_from_cache(self):
+        self.authorized_client.get(reverse('posts:index'))
+        Post.objects.filter(pk=self.post.pk).update(text='Без новой версии')
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Тестовый текст')
+
+    def test_post_edit_bumps_post_card_version(self):
+        self.authorized_client.get(reverse('posts:index'))
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Отредактированный текст'},
+        )
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Отредактированный текст')
+        self.assertNotContains(response, 'Тестовый текст')
+
+    def test_group_and_author_changes_bump_post_cards(self):
+        group = Group.objects.create(title='Старое название', slug='old',
+                                     description='Тестовое описание')
+        Post.objects.create(author=self.user, text='Пост группы',
+                            group=group)
+        self.authorized_client.get(reverse('posts:index'))
+        group.title, group.slug = 'Новое название', 'new'
+        group.save()
+        self.user.first_name = 'Новое'
+        self.user.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новое название')
+        self.assertContains(response, reverse('posts:group_list',
+                                              args=['new']))
+        self.assertContains(response, 'Автор: Новое')
+
+
+class PostImageTests(TempDirMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('small.gif', SMALL_GIF,
+                                     content_type='image/gif'),
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_original_is_shown_until_thumbnail_is_ready(self):
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, self.post.image.url)
+
+    def test_feed_uses_prepared_thumbnail(self):
+        thumbnails.generate(self.post.image.name)
+        thumbnail = thumbnails.lookup(self.post.image, 'feed')
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, thumbnail.url)
+        self.assertNotContains(response, self.post.image.url)
+
+    def test_ready_thumbnail_expires_cached_pages(self):
+        index_url = reverse('posts:index')
+        detail_url = reverse('posts:post_detail',
+                             kwargs={'post_id': self.post.pk})
+        self.guest_client.get(index_url)
+        etag = self.guest_client.get(detail_url)['ETag']
+        thumbnails.generate(self.post.image.name)
+        thumbnail = thumbnails.lookup(self.post.image, 'feed')
+        self.assertContains(self.guest_client.get(index_url), thumbnail.url)
+        response = self.guest_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_page_thumbnails_are_looked_up_together(self):
+        posts = [Post.objects.create(author=self.user, text='Пост',
+                                     image=f'posts/{number}.gif')
+                 for number in range(3)]
+        with self.assertNumQueries(1):
+            thumbnails.attach(posts, 'feed')
+        with self.assertNumQueries(0):
+            thumbnails.attach(posts, 'feed')
+        self.assertIsNone(posts[0].thumbnail)
+
+    def test_post_detail_uses_its_own_size(self):
+        thumbnails.generate(self.post.image.name)
+        thumbnail = thumbnails.lookup(self.post.image, 'detail')
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertContains(response, thumbnail.url)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user,
+                                       text='Тестовый текст')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feed_answers_not_modified_without_queries(self):
+        url = reverse('posts:index')
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_new_post_changes_feed_etag(self):
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        etag = self.guest_client.get(url)['ETag']
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_feed_etag_depends_on_viewer(self):
+        url = reverse('posts:index')
+        etag = self.guest_client.get(url)['ETag']
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_post_detail_answers_not_modified_until_edit(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        last_modified = self.guest_client.get(url)['Last-Modified']
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        etag = self.guest_client.get(url)['ETag']
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Отредактированный текст'},
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Отредактированный текст')
+
+    def test_author_rename_changes_feed_etag_and_page(self):
+        url = reverse('posts:index')
+        etag = self.guest_client.get(url)['ETag']
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name = 'Переименованный'
+        author.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Переименованный')
+        self.assertContains(self.guest_client.get(url), 'Переименованный')
+
+    def test_group_rename_changes_post_detail_etag(self):
+        group = Group.objects.create(title='Группа', slug='old-slug',
+                                     description='Тестовое описание')
+        post = Post.objects.create(author=self.user, text='Пост группы',
+                                   group=group)
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        etag = self.guest_client.get(url)['ETag']
+        group.slug = 'new-slug'
+        group.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other_user = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.penguin_post = Post.objects.create(
+            author=cls.user, text='Пингвины пингвины живут в Антарктиде',
+            group=cls.group)
+        cls.mention_post = Post.objects.create(
+            author=cls.other_user, text='Видел пингвины в зоопарке')
+        cls.other_post = Post.objects.create(
+            author=cls.user, text='Совсем другой текст')
+
+    def setUp(self) -> None:
+        self.guest_client = Client()
+
+    def search(self, **params):
+        response = self.guest_client.get(reverse('posts:search'), params)
+        return response.context['posts']
+
+    def test_search_ranks_relevant_posts_first(self):
+        self.assertEqual(self.search(q='пингвины'),
+                         [self.penguin_post, self.mention_post])
+
+    def test_search_by_prefix(self):
+        self.assertEqual(len(self.search(q='пингв*')), 2)
+        self.assertEqual(self.search(q='пингв'), [])
+
+    def test_search_filters_by_group_and_author(self):
+        self.assertEqual(self.search(q='пингвины', group='test-slug'),
+                         [self.penguin_post])
+        self.assertEqual(self.search(q='пингвины', author='other'),
+                         [self.mention_post])
+
+    def test_search_follows_edited_and_deleted_posts(self):
+        other_post = Post.objects.get(pk=self.other_post.pk)
+        other_post.text = 'Теперь и тут пингвины'
+        other_post.save()
+        self.assertIn(self.other_post, self.search(q='пингвины'))
+        Post.objects.filter(pk=self.penguin_post.pk).delete()
+        self.assertNotIn(self.penguin_post, self.search(q='пингвины'))
+
+    def test_search_ignores_fts_syntax_in_query(self):
+        response = self.guest_client.get(reverse('posts:search'),
+                                         {'q': 'NEAR("пингвины" OR'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_search_rejects_huge_page(self):
+        response = self.guest_client.get(
+            reverse('posts:search'),
+            {'q': 'пингвины', 'page': '100000000000000000000'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context['posts']), [])
+        self.assertIn('page', response.context['form'].errors)
+
+
+@override_settings(GROUP_FEED_SIZE=12)
+class MaterializedGroupFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+        for i in range(15):
+            Post.objects.create(author=cls.user, text=f'Пост {i}',
+                                group=cls.group)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('posts:group_list',
+                           kwargs={'slug': self.group.slug})
+
+    def first_page(self, page='1'):
+        # Каждый раз новый адрес, чтобы не попасть в кеш страниц
+        self.page_number = getattr(self, 'page_number', 0) + 1
+        response = self.guest_client.get(
+            self.url, {'page': page, 'n': self.page_number})
+        return [post.text for post in response.context['page_obj']]
+
+    @override_settings(DATABASE_REPLICAS=['lagging'])
+    def test_entries_are_built_from_primary(self):
+        # Несуществующий алиас: чтение с «реплики» упало бы
+        with replica_reads():
+            feed = materialized.build_entries(self.group.pk, 1)
+        self.assertEqual(len(feed['entries']), 12)
+
+    @override_settings(FEED_CACHE_TIMEOUT=0)
+    def test_cached_group_expires(self):
+        materialized.get_group('test-slug')
+        Group.objects.filter(pk=self.group.pk).update(title='Мимо сигналов')
+        self.assertEqual(materialized.get_group('test-slug').title,
+                         'Мимо сигналов')
+
+    def test_warm_first_page_is_one_query(self):
+        self.first_page()
+        with self.assertNumQueries(1):
+            texts = self.first_page()
+        self.assertEqual(texts, [f'Пост {i}' for i in range(14, 4, -1)])
+
+    def test_new_post_updates_list_in_place(self):
+        self.first_page()
+        Post.objects.create(author=self.user, text='Новый пост',
+                            group=self.group)
+        with self.assertNumQueries(1):
+            texts = self.first_page()
+        self.assertEqual(texts[0], 'Новый пост')
+
+    def test_group_change_moves_post(self):
+        post = Post.objects.filter(group=self.group).first()
+        self.first_page()
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': post.text, 'group': self.other_group.pk},
+        )
+        self.assertNotIn(post.text, self.first_page())
+        response = self.guest_client.get(reverse(
+            'posts:group_list', kwargs={'slug': self.other_group.slug}))
+        self.assertEqual(list(response.context['page_obj']), [post])
+
+    def test_deleted_post_leaves_list(self):
+        post = Post.objects.filter(group=self.group).first()
+        self.first_page()
+        post.delete()
+        self.assertNotIn(post.text, self.first_page())
+        self.assertEqual(len(self.first_page()), 10)
+
+    def test_other_pages_use_database(self):
+        self.first_page()
+        self.assertEqual(self.first_page(page='2'),
+                         [f'Пост {i}' for i in range(4, -1, -1)])
+
+
+class ExportPostsViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff',
+                                             is_staff=True)
+        Post.objects.create(author=cls.user, text='Тестовый текст')
+
+    def setUp(self) -> None:
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_export_is_for_staff_only(self):
+        response = self.authorized_client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_export_streams_posts(self):
+        for export_format, content_type in (
+                ('ndjson', 'application/x-ndjson'),
+                ('csv', 'text/csv; charset=utf-8')):
+            with self.subTest(format=export_format):
+                response = self.staff_client.get(
+                    reverse('posts:export'), {'format': export_format})
+                self.assertTrue(response.streaming)
+                self.assertEqual(response['Content-Type'], content_type)
+                content = b''.join(response.streaming_content).decode()
+                self.assertIn('Тестовый текст', content)
+
+    def test_unknown_format_is_not_found(self):
+        response = self.staff_client.get(reverse('posts:export'),
+                                         {'format': 'xml'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
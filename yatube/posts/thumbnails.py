@@ -0,0 +1,165 @@
+"""Миниатюры картинок постов.
+
+Страницы не вызывают Pillow и не читают исходные файлы: attach только
+ищет готовые миниатюры в хранилище ключей sorl, одним обращением к кешу
+и не больше чем одним запросом к базе на страницу. Создаёт миниатюры
+generate — в фоновом потоке после коммита сохранения поста (schedule)
+или из команды prewarm_thumbnails для картинок, которые поток не успел
+обработать. Готовые миниатюры вытесняют закешированные страницы постов
+с этой картинкой, как правка поста.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from .caching import expire_post_feeds
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд помнить, что миниатюры ещё нет. Дольше не стоит: её
+# создают в другом процессе, а кеш бывает у каждого процесса свой.
+MISS_TIMEOUT = 60
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class KVStore(cached_db_kvstore.KVStore):
+    def get_many(self, image_files):
+        """Как get для нескольких файлов: {ключ файла: ImageFile или None}."""
+        keys = {add_prefix(image_file.key): image_file.key
+                for image_file in image_files}
+        values = self.cache.get_many(keys)
+        missing = keys.keys() - values.keys()
+        if missing:
+            found = dict(KVStoreModel.objects.filter(
+                key__in=missing).values_list('key', 'value'))
+            self.cache.set_many(found, sorl_settings.THUMBNAIL_CACHE_TIMEOUT)
+            self.cache.set_many(
+                dict.fromkeys(missing - found.keys(),
+                              cached_db_kvstore.EMPTY_VALUE),
+                MISS_TIMEOUT)
+            values.update(found)
+        return {
+            key: (deserialize_image_file(values[raw])
+                  if values.get(raw, cached_db_kvstore.EMPTY_VALUE)
+                  != cached_db_kvstore.EMPTY_VALUE else None)
+            for raw, key in keys.items()
+        }
+
+
+class PostThumbnailBackend(ThumbnailBackend):
+    def thumbnail_options(self, source, options):
+        """Опции со значениями по умолчанию, как их дополняет
+        get_thumbnail: от них зависит имя файла миниатюры."""
+        options = dict(options)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        return options
+
+    def thumbnail_file(self, file_, geometry_string, **options):
+        """Файл миниатюры, который создал бы get_thumbnail, без
+        обращения к хранилищам."""
+        source = ImageFile(file_)
+        options = self.thumbnail_options(source, options)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+
+backend = PostThumbnailBackend()
+
+
+def thumbnail_file(image, size):
+    geometry, options = settings.POST_THUMBNAILS[size]
+    return backend.thumbnail_file(image, geometry, **options)
+
+
+def lookup(image, size):
+    """Готовая миниатюра картинки или None."""
+    return default.kvstore.get(thumbnail_file(image, size))
+
+
+def attach(posts, size):
+    """Кладёт постам в post.thumbnail готовые миниатюры размера size.
+
+    Где миниатюры ещё нет, там None: шаблон покажет исходную картинку.
+    """
+    files = {}
+    for post in posts:
+        post.thumbnail = None
+        if post.image:
+            files[post] = thumbnail_file(post.image, size)
+    if not files:
+        return
+    found = default.kvstore.get_many(files.values())
+    for post, image_file in files.items():
+        post.thumbnail = found[image_file.key]
+
+
+def generate(name):
+    """Создаёт миниатюры всех размеров для картинки из MEDIA_ROOT."""
+    for geometry, options in settings.POST_THUMBNAILS.values():
+        backend.get_thumbnail(name, geometry, **options)
+    expire_pages(name)
+
+
+def expire_pages(name):
+    """Вытесняет ленты и ETag постов с картинкой: в них была исходная."""
+    rows = Post.objects.filter(image=name).values_list(
+        'author__username', 'group__slug')
+    usernames, slugs = set(), set()
+    for username, slug in rows:
+        usernames.add(username)
+        if slug:
+            slugs.add(slug)
+    if usernames:
+        expire_post_feeds(usernames, slugs)
+
+
+def try_generate(name):
+    try:
+        generate(name)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', name)
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails')
+        return _executor
+
+
+def run(name):
+    """Задача для фонового потока."""
+    try:
+        try_generate(name)
+    finally:
+        # Соединения с базой у потока свои, их никто больше не закроет
+        connections.close_all()
+
+
+def schedule(name):
+    """После коммита ставит создание миниатюр в очередь фонового потока."""
+    transaction.on_commit(lambda: get_executor().submit(run, name))
@@ -1,30 +1,37 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from yatube import settings
 
-from .forms import PostForm
-from .models import Group, Post, User
+from . import exporters, materialized, thumbnails
+from .caching import (GROUP, INDEX, PROFILE, cache_anonymous_feed,
+                      feed_condition, post_condition)
+from .forms import PostForm, SearchForm
+from .models import Post, PostCounter, User
+from .paginators import get_page_obj
+from .search import search_posts
 
 
+@feed_condition(INDEX)
+@cache_anonymous_feed(INDEX)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, settings.PAGE_SIZE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.feed()
+    page_obj = get_page_obj(request, post_list)
+    thumbnails.attach(page_obj, 'feed')
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@feed_condition(GROUP, 'slug')
+@cache_anonymous_feed(GROUP, 'slug')
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, settings.PAGE_SIZE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = materialized.get_group(slug)
+    page_obj = (materialized.first_page(request, group)
+                or get_page_obj(request, group.posts.feed()))
+    thumbnails.attach(page_obj, 'feed')
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -32,29 +39,32 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@feed_condition(PROFILE, 'username')
+@cache_anonymous_feed(PROFILE, 'username')
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    post_list = user.posts.all()
-    paginator = Paginator(post_list, settings.PAGE_SIZE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    post_number = post_list.count()
+    user = get_object_or_404(User.objects.select_related('post_counter'),
+                             username=username)
+    post_list = user.posts.feed()
+    page_obj = get_page_obj(request, post_list)
+    thumbnails.attach(page_obj, 'feed')
     context = {
         'page_obj': page_obj,
-        'post_number': post_number,
+        'post_number': PostCounter.for_user(user),
         'author': user,  # здесь мне нужен этот контекст,
         # не могу к нему обратиться из шаблона
     }
     return render(request, 'posts/profile.html', context)
 
 
+@post_condition
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    user = get_object_or_404(User, username=post.author)
-    post_number = user.posts.filter(author=user).count()
+    post = get_object_or_404(
+        Post.objects.select_related('author__post_counter', 'group'),
+        pk=post_id)
+    thumbnails.attach([post], 'detail')
     context = {
         'post': post,
-        'post_number': post_number,
+        'post_number': PostCounter.for_user(post.author),
         'post_id': post_id,
     }
     return render(request, 'posts/post_detail.html', context)
@@ -63,7 +73,7 @@ def post_detail(request, post_id):
 @login_required
 def post_create(request):
 
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -80,7 +90,8 @@ def post_edit(request, post_id):
     if post.author != request.user:
         raise Http404
 
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=post)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -89,3 +100,46 @@ def post_edit(request, post_id):
 
     return render(request, 'posts/create_post.html',
                   {'form': form, 'username': request.user, 'is_edit': True})
+
+
+def search(request):
+    form = SearchForm(request.GET or None)
+    posts = []
+    page_number = 1
+    has_next = False
+    if form.is_valid():
+        page_number = form.cleaned_data['page'] or 1
+        posts = search_posts(
+            form.cleaned_data['q'],
+            group=form.cleaned_data['group'],
+            author=form.cleaned_data['author'],
+            limit=settings.PAGE_SIZE + 1,
+            offset=(page_number - 1) * settings.PAGE_SIZE,
+        )
+        has_next = (len(posts) > settings.PAGE_SIZE
+                    and page_number < settings.SEARCH_MAX_PAGE)
+        posts = posts[:settings.PAGE_SIZE]
+        thumbnails.attach(posts, 'feed')
+    query = request.GET.copy()
+    query.pop('page', None)
+    context = {
+        'form': form,
+        'posts': posts,
+        'page_number': page_number,
+        'has_next': has_next,
+        'query': query.urlencode(),
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@staff_member_required
+def export_posts(request):
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in exporters.FORMATS:
+        raise Http404('Неизвестный формат выгрузки')
+    _, content_type = exporters.FORMATS[export_format]
+    response = StreamingHttpResponse(exporters.export_lines(export_format),
+                                     content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{export_format}"')
+    return response
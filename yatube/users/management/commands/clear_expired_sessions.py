@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+DB_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии из базы пачками. В отличие от '
+        'clearsessions, не держит блокировку SQLite на всё удаление: '
+        'между пачками успевают пройти запросы сайта.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Пауза между пачками в секундах')
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_ENGINES:
+            self.stdout.write('Сессии хранятся не в базе, удалять нечего')
+            return
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                keys = list(expired.values_list(
+                    'session_key', flat=True)[:options['batch_size']])
+                if not keys:
+                    break
+                Session.objects.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено истёкших сессий: {deleted}'))
@@ -0,0 +1,27 @@
+import datetime as dt
+from io import StringIO
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+
+class ClearExpiredSessionsCommandTest(TestCase):
+    def create_session(self, expire_date):
+        session = SessionStore()
+        session.create()
+        Session.objects.filter(session_key=session.session_key).update(
+            expire_date=expire_date)
+        return session.session_key
+
+    def test_deletes_only_expired_sessions(self):
+        now = timezone.now()
+        for _ in range(5):
+            self.create_session(now - dt.timedelta(days=1))
+        live_key = self.create_session(now + dt.timedelta(days=1))
+        call_command('clear_expired_sessions', batch_size=2, pause=0,
+                     stdout=StringIO())
+        self.assertEqual(list(Session.objects.values_list(
+            'session_key', flat=True)), [live_key])
@@ -0,0 +1,10 @@
+"""
+Settings profile is chosen by the DJANGO_ENV environment variable:
+``dev`` (default) or ``prod``.
+"""
+import os
+
+if os.getenv('DJANGO_ENV', 'dev') == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
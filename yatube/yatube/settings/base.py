@@ -0,0 +1,334 @@
+"""
+Base Django settings for yatube project, shared by the dev and prod profiles.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv(
+    'SECRET_KEY', '+ay5z6f_+utj6660nmf5&!#!^cb&o#^o3%0&86haeqqknm#wda')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '').split()
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'posts:index'
+
+PAGE_SIZE = 10
+# Дальше этой страницы поиск не листается: OFFSET растёт линейно, а
+# огромный номер страницы не помещается в целое SQLite
+SEARCH_MAX_PAGE = 100
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Application definition
+
+INSTALLED_APPS = [
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.ViewMetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaReadMiddleware',
+]
+
+# Ответы каких представлений сжимать и с какого размера, если
+# включён core.middleware.CompressionMiddleware (боевой профиль)
+COMPRESS_VIEWS = {
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:search',
+    'posts:export',
+    'posts:index_rss',
+    'posts:index_atom',
+    'posts:group_rss',
+    'posts:group_atom',
+    'posts:profile_rss',
+    'posts:profile_atom',
+    'api:posts',
+    'api:groups',
+    'api:group_posts',
+    'api:profile_posts',
+}
+COMPRESS_MIN_SIZE = 1024
+
+# Бюджеты запросов к базе на один ответ, см. core.middleware
+VIEW_QUERY_BUDGETS = {
+    'posts:index': 4,
+    'posts:group_list': 5,
+    'posts:profile': 5,
+    'posts:post_detail': 4,
+    'posts:search': 5,
+    'posts:post_create': 10,
+    'posts:post_edit': 9,
+    'posts:index_rss': 1,
+    'posts:index_atom': 1,
+    'posts:group_rss': 2,
+    'posts:group_atom': 2,
+    'posts:profile_rss': 2,
+    'posts:profile_atom': 2,
+    'api:posts': 1,
+    'api:post_detail': 2,
+    'api:groups': 1,
+    'api:group_detail': 1,
+    'api:group_posts': 2,
+    'api:profile_detail': 1,
+    'api:profile_posts': 2,
+}
+VIEW_QUERY_BUDGET_STRICT = False
+
+ROOT_URLCONF = 'yatube.urls'
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'core.context_processors.post_cards.post_cards',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', os.path.join(BASE_DIR, 'db.sqlite3')),
+        # Сколько ждать, пока другой процесс допишет, вместо
+        # немедленного «database is locked»
+        'OPTIONS': {'timeout': 20},
+    }
+}
+
+# Реплики только для чтения: пути к файлам SQLite через запятую.
+# Локально их обновляет `manage.py replicate_sqlite`.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+        filter(None, os.getenv('SQLITE_REPLICA_PATHS', '').split(',')), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Представления, которым можно читать с реплик (см. core.middleware).
+# Анонимные страницы лент кешируются по версии, поэтому отставание
+# реплики может задержаться в кеше до FEED_CACHE_TIMEOUT.
+REPLICA_READ_VIEWS = {
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:search',
+    'posts:index_rss',
+    'posts:index_atom',
+    'posts:group_rss',
+    'posts:group_atom',
+    'posts:profile_rss',
+    'posts:profile_atom',
+    'api:posts',
+    'api:post_detail',
+    'api:groups',
+    'api:group_detail',
+    'api:group_posts',
+    'api:profile_detail',
+    'api:profile_posts',
+}
+# Сколько секунд после записи посетитель читает из основной базы,
+# чтобы увидеть свои изменения
+REPLICA_STICKY_SECONDS = 15
+
+# Выполняются на каждом новом соединении с SQLite (см. core.db).
+# WAL позволяет нескольким воркерам читать, пока один пишет.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+if os.getenv('FILE_CACHE_DIR'):
+    # Общий кеш для нескольких процессов-воркеров
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('FILE_CACHE_DIR'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+# Хранилище сессий выбирается переменной SESSION_BACKEND:
+# db — строка в базе на каждый запрос авторизованного посетителя;
+# cached_db — чтение из кеша, запись сквозная в базу;
+# signed_cookies — сессия целиком в подписанной cookie, без базы, но
+# её нельзя отозвать на сервере (только сменой SECRET_KEY).
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+
+def session_engine(backend):
+    try:
+        return SESSION_ENGINES[backend]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f'SESSION_BACKEND={backend!r}: допустимы '
+            f'{", ".join(SESSION_ENGINES)}') from None
+
+
+SESSION_ENGINE = session_engine(os.getenv('SESSION_BACKEND', 'db'))
+
+# Кеш страниц лент для анонимных посетителей
+FEED_CACHE_ALIAS = 'default'
+FEED_CACHE_TIMEOUT = 60 * 5
+# Сколько живёт версия области ленты. Ключ заводится на любой запрошенный
+# слаг или имя, даже несуществующие, поэтому бессрочным быть не может;
+# пропавшая версия просто начинается заново от текущего времени
+FEED_VERSION_TIMEOUT = 60 * 60 * 24
+# Сколько последних постов группы держать в материализованной ленте
+GROUP_FEED_SIZE = 100
+
+# Миниатюры картинок постов: имя размера -> (геометрия, опции sorl).
+# Их готовит фоновый поток после сохранения поста или команда
+# prewarm_thumbnails, а шаблоны только ищут готовые в хранилище ключей
+# sorl (см. posts.thumbnails).
+POST_THUMBNAILS = {
+    'feed': ('960x339', {'crop': 'center', 'upscale': True}),
+    'detail': ('960', {'upscale': False}),
+}
+# Потоков на процесс, в которых создаются миниатюры
+THUMBNAIL_WORKERS = 2
+# Хранилище sorl, умеющее искать миниатюры всей страницы разом
+THUMBNAIL_KVSTORE = 'posts.thumbnails.KVStore'
+
+# Сколько последних постов в RSS и Atom и сколько хранить готовый XML:
+# ключ кеша включает версию области, так что срок может быть большим
+SYNDICATION_SIZE = 20
+SYNDICATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Размер страницы JSON API по умолчанию и наибольший для ?limit=
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Сколько строк выгрузка постов читает из базы за раз (см. posts.exporters)
+EXPORT_CHUNK_SIZE = 2000
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+
+# Сюда collectstatic собирает статику для веб-сервера
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
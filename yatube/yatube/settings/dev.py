@@ -0,0 +1,26 @@
+"""
+Development settings for yatube project. Also used by the test suites.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+from .base import *  # noqa: F401,F403
+from .base import MEDIA_ROOT
+
+DEBUG = True
+
+# Превышение бюджета запросов роняет запрос, а значит и тест
+VIEW_QUERY_BUDGET_STRICT = True
+
+# Тесты (manage.py test и pytest) создают посты с картинками: файлы
+# пишутся во временный каталог, который удаляется при выходе, а не в
+# media/ проекта. MEDIA_ROOT из окружения важнее обоих.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+if os.getenv('MEDIA_ROOT'):
+    MEDIA_ROOT = os.getenv('MEDIA_ROOT')
+elif TESTING:
+    MEDIA_ROOT = tempfile.mkdtemp(prefix='yatube-media-')
+    atexit.register(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
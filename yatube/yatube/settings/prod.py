@@ -0,0 +1,59 @@
+"""
+Production settings for yatube project.
+
+Selected with DJANGO_ENV=prod (or DJANGO_SETTINGS_MODULE=yatube.settings.prod).
+"""
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import CACHES, DATABASES, MIDDLEWARE, TEMPLATES, session_engine
+
+SECRET_KEY = os.environ['SECRET_KEY']
+
+DEBUG = False
+
+# Соединения с базой и репликами переживают запрос и переиспользуются
+# воркером
+DATABASES = copy.deepcopy(DATABASES)
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 600))
+
+# Сжатие ответов сразу после сбора метрик: в них попадает и его время
+MIDDLEWARE = [
+    MIDDLEWARE[0],
+    'core.middleware.CompressionMiddleware',
+    *MIDDLEWARE[1:],
+]
+
+# Статика с хешем содержимого в имени и готовыми .gz/.br рядом:
+# её можно отдавать с кешированием на годы (см. core.storage)
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Сессии читаются из кеша, а не из базы на каждый запрос, но только из
+# общего для всех воркеров кеша: в LocMemCache у каждого процесса своя
+# копия, и выход из аккаунта в одном воркере не отзывает сессию в других
+SESSION_CACHE_ALIAS = os.getenv('SESSION_CACHE_ALIAS', 'default')
+SHARED_SESSION_CACHE = CACHES[SESSION_CACHE_ALIAS]['BACKEND'] not in {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+SESSION_BACKEND = os.getenv(
+    'SESSION_BACKEND', 'cached_db' if SHARED_SESSION_CACHE else 'db')
+if SESSION_BACKEND == 'cached_db' and not SHARED_SESSION_CACHE:
+    raise ImproperlyConfigured(
+        'SESSION_BACKEND=cached_db требует общего кеша (FILE_CACHE_DIR)')
+SESSION_ENGINE = session_engine(SESSION_BACKEND)
+
+# Шаблоны компилируются один раз на процесс: cached-загрузчик хранит
+# скомпилированные шаблоны и не ищет файлы заново по всем каталогам.
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]